@@ -0,0 +1,209 @@
+"""
+Measure how long it takes for the baseline plot to catch up with a dragged
+baseline interpolation region.
+
+Mouse motion events are replayed in real time at --rate Hz on a dense spectrum.
+Every settings change runs the full path: Calculation_listener.update_from_plot,
+baseline correction and redrawing the baseline plot on an Agg canvas. Latency is
+the time between a motion event and the end of the first recalculation that
+includes its position.
+
+    python benchmarks/drag_latency.py --points 20000 --budgets 0 40
+"""
+
+import argparse
+import heapq
+import pathlib
+import sys
+import time
+from types import SimpleNamespace
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backend_bases import NavigationToolbar2, TimerBase
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1]))
+
+# src.plots selects the TkAgg backend on import, keep Agg to draw off-screen
+matplotlib.use("Agg")
+_use, matplotlib.use = matplotlib.use, lambda *args, **kwargs: None
+
+from src import app_configuration  # noqa: E402
+from src.event_management.calculate_handler import Calculation_listener  # noqa: E402
+from src.event_management.plot_handler import Plot_listener  # noqa: E402
+from src.plots import Baseline_correction_plot, drag_polygons  # noqa: E402
+from src.spectral_processing import Database_controller  # noqa: E402
+
+matplotlib.use = _use
+
+
+class Event_loop:
+    """
+    Minimal real time event loop for the timers of drag_polygons
+    """
+
+    def __init__(self):
+        self.timers = []
+        self._counter = 0
+
+    def add(self, timer: "Loop_timer") -> None:
+        self._counter += 1
+        due = time.perf_counter() + timer.interval / 1e3
+        heapq.heappush(self.timers, (due, self._counter, timer))
+
+    def remove(self, timer: "Loop_timer") -> None:
+        self.timers = [t for t in self.timers if t[2] is not timer]
+        heapq.heapify(self.timers)
+
+    @property
+    def next_due(self) -> float:
+        return self.timers[0][0] if self.timers else np.inf
+
+    def fire(self) -> None:
+        _, _, timer = heapq.heappop(self.timers)
+        timer._on_timer()
+
+
+class Loop_timer(TimerBase):
+    def __init__(self, loop: Event_loop, *args, **kwargs):
+        self.loop = loop
+        super().__init__(*args, **kwargs)
+
+    def _timer_start(self):
+        self.loop.add(self)
+
+    def _timer_stop(self):
+        self.loop.remove(self)
+
+
+def make_spectrum(points: int):
+    rng = np.random.default_rng(0)
+    x = np.linspace(100, 4000, points)
+    y = (
+        1e3 * np.exp(-(((x - 500) / 50) ** 2))
+        + 8e2 * np.exp(-(((x - 1000) / 40) ** 2))
+        + 3e2 * np.exp(-(((x - 3550) / 100) ** 2))
+        + 50
+        + 0.01 * x
+        + rng.normal(0, 3, points)
+    )
+    return x, y
+
+
+def setup(points: int):
+    app_configuration.gui["current_tab"] = "baseline"
+
+    database_controller = Database_controller()
+    database_controller.add_spectra([make_spectrum(points)], names=["sample"])
+
+    screen = SimpleNamespace(resolution=(1200, 800), scaling=1, dpi=100)
+    plot = Baseline_correction_plot(screen)
+    NavigationToolbar2(plot.fig.canvas)
+
+    listeners = (
+        Calculation_listener(database_controller),
+        Plot_listener({"baseline": plot}),
+    )
+    listeners[0].switch_sample(index=0)
+
+    return plot, listeners
+
+
+def run(points: int, budget: int, rate: float, duration: float, distance: float):
+    drag_polygons.frame_budget = budget
+    plot, listeners = setup(points)
+
+    loop = Event_loop()
+    plot.fig.canvas.new_timer = lambda *args, **kwargs: Loop_timer(
+        loop, *args, **kwargs
+    )
+
+    # Drag the right border of the first H2O region bir
+    drag = plot.plot_interactions[1]
+    x_start = max(c[0] for c in drag.polygons[0].get_xy())
+    amount = int(rate * duration)
+    positions = x_start + np.linspace(0, distance, amount + 1)[1:]
+
+    def mouse_event(x):
+        return SimpleNamespace(xdata=x, button=1, inaxes=drag.ax)
+
+    latest_event = [-1]
+    completed = np.full(amount, np.nan)
+    recalculations = [0]
+    send_bir_change = drag.send_bir_change
+
+    def send_and_record(poly_id):
+        handled = latest_event[0]
+        send_bir_change(poly_id)
+        done = time.perf_counter()
+        recalculations[0] += 1
+        pending = np.isnan(completed[: handled + 1])
+        completed[: handled + 1][pending] = done
+
+    drag.send_bir_change = send_and_record
+    drag.on_click(mouse_event(x_start))
+
+    start = time.perf_counter()
+    arrivals = start + np.arange(1, amount + 1) / rate
+    release = arrivals[-1] + 1 / rate
+    released = False
+    i = 0
+    while not released or loop.timers:
+        next_event = arrivals[i] if i < amount else release
+        if released:
+            next_event = np.inf
+        wait = min(next_event, loop.next_due) - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+
+        if next_event <= loop.next_due:
+            if i < amount:
+                latest_event[0] = i
+                drag.on_motion(mouse_event(positions[i]))
+                i += 1
+            else:
+                drag.on_release(mouse_event(positions[-1]))
+                released = True
+        else:
+            loop.fire()
+
+    latency = (completed - arrivals) * 1e3
+    settled = (np.nanmax(completed) - release) * 1e3
+    plt.close(plot.fig)
+
+    return {
+        "budget": budget,
+        "recalculations": recalculations[0],
+        "mean": np.nanmean(latency),
+        "p95": np.nanpercentile(latency, 95),
+        "max": np.nanmax(latency),
+        "settled": max(settled, 0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[0, 40])
+    parser.add_argument("--rate", type=float, default=100, help="motion events/s")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds")
+    parser.add_argument("--distance", type=float, default=150, help="cm-1")
+    args = parser.parse_args()
+
+    print(f"{args.points} points, {args.rate:.0f} motion events/s")
+    print(
+        f"{'budget (ms)':>12}{'recalcs':>9}{'mean':>9}{'p95':>9}{'max':>9}"
+        f"{'settled':>9}  (latencies in ms)"
+    )
+    for budget in args.budgets:
+        result = run(args.points, budget, args.rate, args.duration, args.distance)
+        print(
+            f"{result['budget']:>12}{result['recalculations']:>9}"
+            f"{result['mean']:>9.0f}{result['p95']:>9.0f}{result['max']:>9.0f}"
+            f"{result['settled']:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare the spectrum text reader with the previous pandas python-engine parser.
+
+    python benchmarks/spectrum_reader.py --amounts 1000 10000
+"""
+
+import argparse
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1]))
+
+from src.spectral_processing.spectrum_io import read_spectrum  # noqa: E402
+
+
+def read_spectrum_previous(file):
+    try:
+        with np.load(file) as f:
+            return f["x"], f["y"]
+    except ValueError:
+        spectrum = pd.read_csv(file, delimiter="\t|,", header=None, engine="python")
+        return [spectrum.iloc[:, col].to_numpy() for col in spectrum]
+
+
+def write_spectra(folder: pathlib.Path, amount: int, length: int):
+    rng = np.random.default_rng(0)
+    x = np.linspace(100, 4000, length)
+    files = []
+    for i in range(amount):
+        y = 1e3 * np.exp(-(((x - 500) / 50) ** 2)) + rng.normal(0, 3, length)
+        file = folder / f"spectrum_{i:05d}.txt"
+        np.savetxt(file, np.column_stack([x, y]), delimiter="\t", fmt="%.4f")
+        files.append(file)
+    return files
+
+
+def time_reader(reader, files) -> float:
+    start = time.perf_counter()
+    for file in files:
+        reader(file)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--amounts", type=int, nargs="+", default=[1000])
+    parser.add_argument("--length", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'spectra':>8} {'previous (s)':>14} {'new (s)':>10} {'speedup':>8}")
+    for amount in args.amounts:
+        with tempfile.TemporaryDirectory() as folder:
+            files = write_spectra(pathlib.Path(folder), amount, args.length)
+
+            # The previous parser can be 1 ulp off, the new one is correctly rounded
+            for file in files[:5]:
+                for new, old in zip(read_spectrum(file), read_spectrum_previous(file)):
+                    assert np.allclose(new, old, rtol=1e-15, atol=0)
+
+            previous = time_reader(read_spectrum_previous, files)
+            new = time_reader(read_spectrum, files)
+
+        print(f"{amount:>8} {previous:>14.2f} {new:>10.2f} {previous / new:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
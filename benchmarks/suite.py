@@ -0,0 +1,227 @@
+"""
+Benchmark suite for sample processing and projects, with results written as JSON.
+
+Synthetic glass spectra and an olivine interference spectrum are generated with a
+fixed seed, so that runs on different versions can be compared. Processing stages
+are timed per sample for every spectrum length, project stages for every sample
+count and saving all samples to the dataframes for every --save-samples count.
+
+    python benchmarks/suite.py --lengths 2000 8000 --samples 10 100 -o results.json
+"""
+
+import argparse
+import datetime
+import importlib.metadata
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1]))
+
+from benchmarks.synthetic import make_glass, make_olivine, new_database  # noqa: E402
+from src.event_management.database_handler import Database_listener  # noqa: E402
+from src.spectral_processing import Calibration_processor  # noqa: E402
+from src.spectral_processing.result_cache import result_cache  # noqa: E402
+from src.spectral_processing.sample_processing import h2o_processor  # noqa: E402
+
+processing_stages = (
+    "h2o_processor",
+    "calculate_baseline",
+    "calculate_noise",
+    "calculate_areas",
+    "calculate_interpolation",
+    "subtract_interference",
+)
+project_stages = ("save_all_samples", "save_project_data", "load_project")
+
+
+def summarise(name: str, times: List[float], **parameters) -> Dict:
+    return {
+        "benchmark": name,
+        **parameters,
+        "repeats": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "times": times,
+    }
+
+
+def timed(func: Callable, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def benchmark_processing(length: int, repeats: int) -> List[Dict]:
+    """
+    Time the processing stages of h2o_processor on one sample
+    """
+    database_controller = new_database([make_glass(length, seed=0)])
+    name = database_controller.names[0]
+    settings = database_controller.settings.loc[name]
+    baseline_regions = database_controller.baseline_regions.loc[name]
+    interpolation_regions = database_controller.interpolation_regions.loc[name]
+    olivine = make_olivine(max(length // 3, 100), seed=1)
+
+    times = {stage: [] for stage in processing_stages}
+    for i in range(repeats):
+        x, y = make_glass(length, seed=i)
+        start = time.perf_counter()
+        sample = h2o_processor(
+            name=name,
+            x=x,
+            y=y,
+            settings=settings.copy(),
+            baseline_regions=baseline_regions.copy(),
+            interpolation_regions=interpolation_regions.copy(),
+        )
+        times["h2o_processor"].append(time.perf_counter() - start)
+
+        for stage in ("calculate_baseline", "calculate_noise", "calculate_areas"):
+            times[stage].append(timed(getattr(sample, stage)))
+        times["calculate_interpolation"].append(
+            timed(sample.calculate_interpolation, interference=False)
+        )
+
+        database_controller.registry.set(0, sample)
+        database_controller._set_interference(sample, *olivine)
+        sample.interference_sample.calculate_baseline()
+        times["subtract_interference"].append(timed(sample.subtract_interference))
+
+    return [
+        summarise(stage, stage_times, length=length, samples=1)
+        for stage, stage_times in times.items()
+    ]
+
+
+def benchmark_project(length: int, samples: int, repeats: int) -> List[Dict]:
+    """
+    Time saving samples, writing a project and reading it again
+    """
+    spectra = [make_glass(length, seed=i) for i in range(samples)]
+    times = {stage: [] for stage in project_stages}
+
+    with tempfile.TemporaryDirectory() as folder:
+        for i in range(repeats):
+            database_controller = new_database(spectra)
+            for sample in database_controller.spectra:
+                sample.calculate_results()
+            listener = Database_listener(database_controller, Calibration_processor())
+
+            times["save_all_samples"].append(
+                timed(database_controller.save_all_samples)
+            )
+
+            filepath = pathlib.Path(folder) / f"project_{i}.h2o"
+            times["save_project_data"].append(
+                timed(listener.save_project_data, filepath, name=filepath.stem)
+            )
+            # Lazily loaded samples are read from the project when they are needed
+            times["load_project"].append(
+                timed(listener.load_project, filepath=str(filepath))
+            )
+
+    return [
+        summarise(stage, stage_times, length=length, samples=samples)
+        for stage, stage_times in times.items()
+    ]
+
+
+def benchmark_save(length: int, samples: int, repeats: int) -> List[Dict]:
+    """
+    Time writing settings, regions and results of all samples to the dataframes
+    """
+    database_controller = new_database(
+        [make_glass(length, seed=i) for i in range(samples)]
+    )
+    times = []
+    for _ in range(repeats):
+        for sample in database_controller.spectra:
+            sample.modified = True
+        times.append(timed(database_controller.save_all_samples, modified_only=True))
+
+    return [summarise("save_all_samples", times, length=length, samples=samples)]
+
+
+def get_metadata(args: argparse.Namespace) -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=pathlib.Path(__file__).parent,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "ramCOH": importlib.metadata.version("ramCOH"),
+        "arguments": {
+            key: str(value) if isinstance(value, pathlib.Path) else value
+            for key, value in vars(args).items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[2000, 8000])
+    parser.add_argument("--samples", type=int, nargs="+", default=[10, 100])
+    parser.add_argument(
+        "--save-samples", type=int, nargs="*", default=[100, 1000, 10000]
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--project-length", type=int, default=2000, help="spectrum length of projects"
+    )
+    parser.add_argument("-o", "--output", type=pathlib.Path, help="JSON file")
+    args = parser.parse_args()
+
+    # Every repeat should calculate from scratch
+    result_cache.max_size = 0
+
+    results = []
+    for length in args.lengths:
+        results.extend(benchmark_processing(length, args.repeats))
+    for samples in args.samples:
+        results.extend(
+            benchmark_project(args.project_length, samples, max(args.repeats // 2, 1))
+        )
+    for samples in args.save_samples:
+        results.extend(benchmark_save(args.project_length, samples, args.repeats))
+
+    output = {"metadata": get_metadata(args), "results": results}
+    text = json.dumps(output, indent=2)
+    if args.output is None:
+        print(text)
+        return
+
+    args.output.write_text(text)
+    print(f"{'benchmark':<24}{'length':>8}{'samples':>9}{'median (ms)':>13}")
+    for result in results:
+        print(
+            f"{result['benchmark']:<24}{result['length']:>8}{result['samples']:>9}"
+            f"{result['median'] * 1e3:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
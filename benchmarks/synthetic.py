@@ -0,0 +1,81 @@
+"""
+Synthetic spectra and databases for the benchmarks and tests.
+
+Spectra are generated with a fixed seed, so that runs on different versions can
+be compared. Importing this module keeps matplotlib on the Agg backend, so that
+the package can be imported without a display.
+"""
+
+import pathlib
+import sys
+from typing import List, Optional, Tuple
+
+import matplotlib
+import numpy as np
+import numpy.typing as npt
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1]))
+
+# src.plots selects the TkAgg backend on import, keep Agg to run without display
+matplotlib.use("Agg")
+_use, matplotlib.use = matplotlib.use, lambda *args, **kwargs: None
+
+import src.event_management  # noqa: E402, F401
+from src.spectral_processing import Database_controller  # noqa: E402
+
+matplotlib.use = _use
+
+
+def lorentz(x, center, height, width):
+    return height / (1 + ((x - center) / width) ** 2)
+
+
+def make_glass(length: int, seed: int) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Basaltic glass like spectrum with silicate bands and an H2O band
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(100, 4000, length)
+    water = rng.uniform(0.5, 2)
+    y = (
+        8e2 * np.exp(-(((x - 500) / 80) ** 2))
+        + 3e2 * np.exp(-(((x - 700) / 60) ** 2))
+        + 1e3 * np.exp(-(((x - 980) / 70) ** 2))
+        + water * 2e2 * np.exp(-(((x - 3550) / 110) ** 2))
+        + 50
+        + 0.02 * x
+        + rng.normal(0, 3, length)
+    )
+    return x, y
+
+
+def make_olivine(length: int, seed: int) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Olivine spectrum with its 820 - 850 cm-1 doublet
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(100, 1400, length)
+    y = 50 + 0.02 * x + rng.normal(0, 2, length)
+    for center, height, width in (
+        (822, 900, 6),
+        (853, 1100, 6),
+        (918, 150, 8),
+        (960, 200, 8),
+        (300, 100, 10),
+    ):
+        y += lorentz(x, center, height, width)
+    return x, y
+
+
+def new_database(
+    spectra: List[Tuple[npt.NDArray, npt.NDArray]],
+    names: Optional[List[str]] = None,
+) -> Database_controller:
+    """
+    Database with spectra as samples, named glass_00000 etc. by default
+    """
+    if names is None:
+        names = [f"glass_{i:05d}" for i in range(len(spectra))]
+    database_controller = Database_controller()
+    database_controller.add_spectra(spectra, names=names, calculate_results=False)
+    return database_controller
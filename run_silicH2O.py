@@ -1,5 +1,8 @@
+from multiprocessing import freeze_support
+
 from src.silicH2O import silicH2O
 
 if __name__ == "__main__":
+    freeze_support()
     app = silicH2O()
     app.run()
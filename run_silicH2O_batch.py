@@ -0,0 +1,8 @@
+import sys
+from multiprocessing import freeze_support
+
+from src.batch_processing import main
+
+if __name__ == "__main__":
+    freeze_support()
+    sys.exit(main())
@@ -4,7 +4,7 @@ import pathlib
 import shutil
 import sys
 from itertools import product
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import numpy.typing as npt
@@ -33,8 +33,10 @@ def make_bir_series(birs: Dict[str, Tuple[int, int]]):
     return pd.Series(values, index=index)
 
 
-def get_settings_from_json(type: str):
-    with open(f"{config_path}/{type}_settings.json") as f:
+def get_settings_from_json(type: str, filepath: Optional[str] = None):
+    if filepath is None:
+        filepath = f"{config_path}/{type}_settings.json"
+    with open(filepath) as f:
         process = json.load(f)
 
     names = process.keys()
@@ -55,9 +57,9 @@ with open(f"{config_path}/general_settings.json") as f:
 
 
 def get_default_settings(
-    names: List[str], type: str
+    names: List[str], type: str, filepath: Optional[str] = None
 ) -> Tuple[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]]:
-    setting_names, dicts = get_settings_from_json(type)
+    setting_names, dicts = get_settings_from_json(type, filepath=filepath)
 
     baseline_interpolation_regions = []
     for dic in dicts:
@@ -0,0 +1,2 @@
+from .batch_processor import *
+from .cli import main
@@ -0,0 +1,136 @@
+import glob
+import os
+import pathlib
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .. import app_configuration
+from ..spectral_processing import Calibration_processor, Database_controller
+from ..spectral_processing.sample_names import get_names_from_files
+
+
+class Batch_processor:
+    """
+    Headless processing of spectra, without the GUI, plots or event listeners.
+
+    Settings are read from json files formatted like glass_settings.json and
+    interference_settings.json. The configuration folder defaults are used when no
+    file is given.
+    """
+
+    def __init__(
+        self,
+        glass_settings: Optional[str] = None,
+        interference_settings: Optional[str] = None,
+        name_delimiter: Optional[str] = None,
+        processes: Optional[int] = None,
+    ):
+        self.glass_settings = glass_settings
+        self.interference_settings = interference_settings
+        self.name_delimiter = name_delimiter
+
+        self.database_controller = Database_controller()
+        if processes is not None:
+            self.database_controller.processes = processes
+        self.calibration = Calibration_processor()
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.database_controller.names)
+
+    def read_files(self, files: List[str]) -> None:
+        names = get_names_from_files(
+            files, previous_names=self.names, delimiter=self.name_delimiter
+        )
+        settings = _get_settings(
+            names=names, type="glass", filepath=self.glass_settings
+        )
+
+        self.database_controller.read_files(
+            files, names=names, settings=settings, calculate_results=False
+        )
+
+    def add_interference(self, file: str) -> None:
+        """
+        Add the same interference spectrum to all samples
+        """
+        settings = _get_settings(
+            names=self.names, type="interference", filepath=self.interference_settings
+        )
+        self.database_controller.apply_interference(
+            file=file, names=self.names, settings=settings
+        )
+
+    def read_calibration(self, filepath: str) -> None:
+        filepath = pathlib.Path(filepath)
+        calibration_data = pd.read_parquet(filepath).sort_index()
+
+        self.calibration.import_calibration(
+            name=filepath.stem,
+            H2OSi=calibration_data["H2OSi"],
+            H2Oreference=calibration_data["H2Oreference"],
+            use=calibration_data["use"],
+        )
+        self.calibration.calibrate()
+        self.calibration.use_calibration = True
+
+        self.database_controller.set_calibration(
+            name=self.calibration.name, calibration=self.calibration._calculate_H2O
+        )
+
+    def process_interference(self) -> None:
+        self.database_controller.subtract_interferences()
+
+    def process_interpolation(self) -> None:
+        for sample in self.database_controller.spectra:
+            if not sample.interpolation.settings.use:
+                continue
+            sample.calculate_interpolation(interference=False)
+
+    def process(self) -> None:
+        self.process_interference()
+        self.process_interpolation()
+        self.database_controller.save_all_samples()
+
+    def export_results(self, filepath: str, incl_settings: bool = True) -> None:
+        filepath = pathlib.Path(filepath)
+        folder = filepath.parents[0]
+        folder.mkdir(parents=True, exist_ok=True)
+
+        self.database_controller.export_results(
+            folder=folder, name=filepath.stem, incl_settings=incl_settings
+        )
+
+    def export_spectra(self, folderpath: str) -> None:
+        self.database_controller.export_all(folderpath=pathlib.Path(folderpath))
+
+    def export_spectra_file(self, filepath: str, layout: str = "long") -> None:
+        self.database_controller.export_spectra(
+            filepath=pathlib.Path(filepath), layout=layout
+        )
+
+
+def find_spectrum_files(inputs: List[str], extension: str = ".txt") -> List[str]:
+    """
+    Expand directories and glob patterns to a sorted list of spectrum files
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            item = os.path.join(item, f"*{extension}")
+        files.extend(sorted(glob.glob(item)))
+
+    # Remove duplicates, keep order
+    return list(dict.fromkeys(files))
+
+
+def _get_settings(names: List[str], type: str, filepath: Optional[str]) -> Dict:
+    settings, (birs, *regions) = app_configuration.get_default_settings(
+        names, type=type, filepath=filepath
+    )
+    settings = {"settings": settings, "baseline_interpolation_regions": birs}
+    if type == "glass":
+        settings["interpolation_regions"] = regions[0]
+
+    return settings
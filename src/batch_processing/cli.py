@@ -0,0 +1,106 @@
+import argparse
+import pathlib
+import sys
+from typing import List, Optional
+
+import blinker as bl
+
+from .batch_processor import Batch_processor, find_spectrum_files
+
+on_display_message = bl.signal("display message")
+
+
+def print_message(*args, message: str, **kwargs):
+    print(message.strip(), file=sys.stderr)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="silich2o-batch",
+        description="Process Raman spectra of silicate glasses without the GUI",
+    )
+    parser.add_argument(
+        "inputs", nargs="+", help="spectrum files, directories or glob patterns"
+    )
+    parser.add_argument(
+        "-o", "--output", required=True, help="csv file for the results table"
+    )
+    parser.add_argument(
+        "-s", "--settings", help="glass settings json, defaults to glass_settings.json"
+    )
+    parser.add_argument("-c", "--calibration", help=".cH2O calibration file")
+    parser.add_argument(
+        "-i", "--interference", help="interference spectrum used for all samples"
+    )
+    parser.add_argument(
+        "--interference-settings",
+        help="interference settings json, defaults to interference_settings.json",
+    )
+    parser.add_argument(
+        "-d", "--delimiter", help="sample name delimiter in the file names"
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        help="worker processes for reading and processing spectra, 0 for all cores",
+    )
+    parser.add_argument(
+        "--export-spectra", metavar="FOLDER", help="write processed spectra to FOLDER"
+    )
+    parser.add_argument(
+        "--spectra-file",
+        metavar="FILE",
+        help="write processed spectra to one .parquet or .arrow FILE",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=("long", "wide"),
+        default="long",
+        help="--spectra-file with one row per point (long) or per sample (wide)",
+    )
+    parser.add_argument(
+        "--no-settings",
+        action="store_true",
+        help="do not export baseline and interpolation regions",
+    )
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = get_parser().parse_args(argv)
+
+    files = find_spectrum_files(args.inputs)
+    if not files:
+        print("no spectra found", file=sys.stderr)
+        return 1
+
+    on_display_message.connect(print_message)
+
+    processor = Batch_processor(
+        glass_settings=args.settings,
+        interference_settings=args.interference_settings,
+        name_delimiter=args.delimiter,
+        processes=args.processes,
+    )
+    processor.read_files(files)
+
+    if args.interference:
+        processor.add_interference(args.interference)
+    if args.calibration:
+        processor.read_calibration(args.calibration)
+
+    processor.process()
+    processor.export_results(args.output, incl_settings=not args.no_settings)
+
+    if args.export_spectra:
+        processor.export_spectra(args.export_spectra)
+    if args.spectra_file:
+        processor.export_spectra_file(args.spectra_file, layout=args.layout)
+
+    print(
+        f"processed {len(files)} spectra, results written to {pathlib.Path(args.output)}",
+        file=sys.stderr,
+    )
+    return 0
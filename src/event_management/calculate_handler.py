@@ -1,11 +1,15 @@
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import blinker as bl
+import pandas as pd
 
 from .. import app_configuration
+from ..profiling import profile_methods
 from ..spectral_processing import Database_controller
+from ..spectral_processing.background import Background_task
 
 
+@profile_methods
 class Calculation_listener:
 
     on_sample_change = bl.signal("sample change")
@@ -23,6 +27,9 @@ class Calculation_listener:
     on_remove_interference = bl.signal("remove interference")
     on_deconvolve_interference = bl.signal("deconvolve interference")
     on_subtract_interference = bl.signal("subtract interference")
+    on_cancel_task = bl.signal("cancel task")
+    on_sweep_baseline = bl.signal("sweep baseline")
+    on_optimize_birs = bl.signal("optimize birs")
 
     on_set_processing = bl.signal("set processing")
     # on_set_H2Oreference = bl.signal("set H2O reference")
@@ -38,11 +45,18 @@ class Calculation_listener:
 
     on_display_message = bl.signal("display message")
     on_update_gui_variables = bl.signal("update gui variables")
+    on_task_progress = bl.signal("task progress")
+    on_schedule = bl.signal("schedule")
 
     on_change_bir_widgets = bl.signal("change bir widgets")
 
     copied_birs = None
     bir_amount: int = 10
+    # ms between checks on a background task
+    poll_interval: int = 50
+    # Default random baseline sweep, +/- cm-1 on all boundaries
+    sweep_spread: float = 10.0
+    sweep_amount: int = 200
 
     def __init__(
         self,
@@ -51,6 +65,9 @@ class Calculation_listener:
         # gui: Gui,
     ):
         self.database_controller = database_controller
+        self.task: Optional[Background_task] = None
+        # Table from the last baseline sweep
+        self.sweep_results: Optional[pd.DataFrame] = None
         # self.calibration = calibration
         # self.gui = gui
 
@@ -84,9 +101,7 @@ class Calculation_listener:
             )
             return
 
-        sample.calculate_baseline()
-        sample.calculate_noise()
-        sample.calculate_areas()
+        sample.calculate_results()
 
     def display_sample(self, *args):
         try:
@@ -243,26 +258,123 @@ class Calculation_listener:
         self.change_settings(**{group: {"use": value}})
 
     def deconvolve_interference(self, *args):
-        self.on_display_message.send(message="deconvolving ...", duration=None)
-        # with redirect_stdout(Message_processor()):
         sample = self.sample
         interference = sample.interference_sample
-        if interference is None:
+        if interference is None or self.task_running:
             return
 
-        interference.deconvolve()
+        def on_done(results):
+            interference.set_deconvolution(results)
+            self.on_display_message.send(message="deconvolution complete!", duration=5)
+            self.refresh_plots()
 
-        self.on_display_message.send(message="deconvolution complete!", duration=5)
-        self.refresh_plots()
+        self.on_display_message.send(message="deconvolving ...", duration=None)
+        self.run_task(interference.get_deconvolution_job(), on_done)
 
     def subtract_interference(self, *args, **kwargs):
-        self.on_display_message.send(message="subtracting ...", duration=5)
-        # with redirect_stdout(Message_processor()):
-        if not self.sample.subtract_interference():
+        if self.task_running:
+            return
+        sample = self.sample
+        job = sample.get_subtraction_job()
+        if job is None:
             return
 
-        self.on_display_message.send(message="subtraction complete!", duration=5)
-        self.refresh_plots()
+        def on_done(spectrum):
+            sample.set_interference_corrected(spectrum)
+            self.on_display_message.send(message="subtraction complete!", duration=5)
+            self.refresh_plots()
+
+        self.on_display_message.send(message="subtracting ...", duration=None)
+        self.run_task(job, on_done)
+
+    def sweep_baseline(self, *args, **kwargs):
+        """
+        Baseline sensitivity of the current sample in the background, kwargs are
+        passed to h2o_processor.get_sweep_parameters. Without offsets or spread,
+        sweep_amount random combinations within +/- sweep_spread are used.
+        """
+        if self.task_running:
+            return
+        if "offsets" not in kwargs and "spread" not in kwargs:
+            kwargs = {
+                "spread": self.sweep_spread,
+                "amount": self.sweep_amount,
+                **kwargs,
+            }
+        job = self.database_controller.get_sweep_job(
+            names=[self.sample.name], **kwargs
+        )
+
+        def on_done(table):
+            self.sweep_results = table
+            rWS = table["rWS"]
+            self.on_display_message.send(
+                message=f"rWS {rWS.mean():.3f} \u00B1 {rWS.std():.3f}"
+                f" ({len(table)} baselines)",
+                duration=10,
+            )
+
+        self.on_display_message.send(message="sweeping baselines ...", duration=None)
+        self.run_task(job, on_done)
+
+    def optimize_birs(self, *args, index: List[int]):
+        """
+        Optimize the baseline interpolation regions of the selected samples in the
+        background
+        """
+        if self.task_running:
+            return
+        job = self.database_controller.get_optimize_job(indices=index)
+
+        def on_done(samples):
+            self.database_controller.set_samples(index, samples)
+            self.on_display_message.send(
+                message=f"optimized birs of {len(index)} sample(s)", duration=5
+            )
+            self.display_sample()
+
+        self.on_display_message.send(message="optimizing birs ...", duration=None)
+        self.run_task(job, on_done)
+
+    @property
+    def task_running(self) -> bool:
+        return self.task is not None and not self.task.finished
+
+    def run_task(self, func: Callable[[], Any], on_done: Callable[[Any], None]):
+        """
+        Run func on a worker thread, on_done is called with the results from
+        the main loop
+        """
+        self.task = Background_task(
+            func,
+            on_done=on_done,
+            on_progress=self.send_task_progress,
+            on_error=self.task_error,
+            on_cancel=lambda: self.on_display_message.send(message="cancelled"),
+        )
+        self.task.start()
+        self.poll_task()
+
+    def poll_task(self):
+        if not self.on_schedule.receivers:
+            # No main loop to come back to
+            while self.task.poll():
+                self.task.wait(self.poll_interval / 1e3)
+            return
+        if self.task.poll():
+            self.on_schedule.send(delay=self.poll_interval, func=self.poll_task)
+
+    def cancel_task(self, *args):
+        if not self.task_running:
+            return
+        self.task.cancel()
+        self.on_display_message.send(message="cancelling ...", duration=None)
+
+    def send_task_progress(self, fraction: float, message: str):
+        self.on_task_progress.send(fraction=fraction, message=message)
+
+    def task_error(self, error: Exception):
+        self.on_display_message.send(message=f"failed: {error}", duration=5)
 
     def remove_interference(self, *args):
         self.sample.remove_interference()
@@ -342,6 +454,9 @@ class Calculation_listener:
         self.on_remove_interference.connect(self.remove_interference)
         self.on_deconvolve_interference.connect(self.deconvolve_interference)
         self.on_subtract_interference.connect(self.subtract_interference)
+        self.on_cancel_task.connect(self.cancel_task)
+        self.on_sweep_baseline.connect(self.sweep_baseline)
+        self.on_optimize_birs.connect(self.optimize_birs, sender="navigator")
 
         self.on_set_processing.connect(self.set_spectrum_processing)
 
@@ -53,6 +53,8 @@ class Calibration_listener:
             return
 
         self.database_controller.save_results()
+        # Refits only if the results of standards have changed
+        self.calibration.calibrate()
 
     def calibrate_with_project(self, *args, update_gui=True):
         self.calibration.calibrate_with_project(
@@ -107,9 +109,9 @@ class Calibration_listener:
             self.calibrate()
 
     def use_calibration_std(self, *args, sample_index: int):
-        self.calibration.use.iloc[sample_index] = not self.calibration.use.iloc[
-            sample_index
-        ]
+        self.calibration.set_use(
+            sample_index, not self.calibration.use.iloc[sample_index]
+        )
         self.calibrate()
 
     def calibrate(self, update_gui=True):
@@ -1,18 +1,13 @@
-import glob
-import json
 import os
 import pathlib
 import shutil
 import sys
-import tarfile
 import time
 from tkinter import filedialog, messagebox
 from typing import Dict, List, Optional
 
 import blinker as bl
-import numpy as np
 import pandas as pd
-import pyarrow as pa
 
 from .. import app_configuration
 from ..app_configuration import (
@@ -20,9 +15,13 @@ from ..app_configuration import (
     set_glass_settings,
     set_interference_settings,
 )
+from ..profiling import profile_methods
 
 # from ..interface import Gui
 from ..spectral_processing import Calibration_processor, Database_controller
+from ..spectral_processing.project_file import Project_file, Project_writer
+from ..spectral_processing.sample_processing import Lazy_sample
+from ..spectral_processing.sample_names import get_names_from_files
 
 on_display_message = bl.signal("display message")
 
@@ -40,7 +39,11 @@ else:
     temp_folder = pathlib.Path(__file__).parents[1] / "temp"
     calibration_folder = pathlib.Path(__file__).parents[1] / "calibration"
 
+# Fraction of a project file that may be unused data before it is written in full
+max_unused_project_data = 0.5
 
+
+@profile_methods
 class Database_listener:
     on_samples_added = bl.signal("samples added")
     on_load_project = bl.signal("load project")
@@ -64,6 +67,7 @@ class Database_listener:
     on_export_results = bl.signal("export results")
     on_export_sample = bl.signal("export sample")
     on_export_all = bl.signal("export all")
+    on_export_spectra = bl.signal("export spectra")
 
     on_save_calibration_as = bl.signal("save calibration as")
     on_read_calibration_file = bl.signal("read calibration file")
@@ -126,26 +130,12 @@ class Database_listener:
         reset_default_settings(type=type)
 
     def remove_samples(self, *args, index: List[int]) -> None:
-        if self.database_controller.has_project:
-            names = self.database_controller.names[index]
-            if isinstance(names, str):
-                names = [names]
-            self.remove_data(names=names)
-
         self.database_controller.remove_samples(index)
 
         names = list(self.database_controller.names)
         # self.gui.update_variables(sample_navigation={"samplelist": names})
         self.on_update_gui_variables.send(sample_navigation={"samplelist": names})
 
-    def remove_data(self, names: List[str]):
-        temp_path = temp_folder / self.database_controller.project.stem
-        temp_datapath = temp_path / "data"
-
-        for name in names:
-            for file in temp_datapath.rglob(f"{name}.npz"):
-                file.unlink()
-
     def add_samples(self, *args, files: List[str], name_delimiter: str) -> None:
         previous_names = list(self.database_controller.names)
         names = get_names_from_files(
@@ -163,7 +153,11 @@ class Database_listener:
         #     self.gui.activate_widgets()
         #     self.gui.set_state(GUI_state.ACTIVE)
 
-    def load_interference(self, *args):
+    def load_interference(self, *args, index: Optional[List[int]] = None):
+        """
+        Load an interference for the current sample, or load it once for all
+        samples in index and subtract it from them
+        """
         try:
             file = filedialog.askopenfilename(
                 initialdir=os.getcwd(), filetypes=[("txt files", "*.txt")]
@@ -172,7 +166,12 @@ class Database_listener:
             print("Opening files cancelled by user")
             return
 
-        self.database_controller.add_interference(file)
+        if index is None:
+            self.database_controller.add_interference(file)
+        else:
+            names = [self.database_controller.names[i] for i in index]
+            self.database_controller.apply_interference(file, names=names)
+            self.database_controller.subtract_interferences(names=names)
         self.on_interference_added.send()
 
     def new_project(self, *args):
@@ -234,19 +233,6 @@ class Database_listener:
             self.on_change_title.send(title=name)
             self.database_controller.set_project(filepath=filepath)
 
-    def _make_project_folders(self, name: str, base_folder=temp_folder) -> Dict:
-        paths = {"project": base_folder / name}
-        paths["data"] = paths["project"] / "data"
-        paths["processed"] = paths["data"] / "processed"
-        paths["interference"] = paths["data"] / "interference"
-
-        for dir in paths.values():
-            if dir.is_dir():
-                continue
-            dir.mkdir(parents=True, exist_ok=True)
-
-        return paths
-
     def save_calibration_data(self, *args, name: Optional[str] = None):
         if name is None:
             name = self.calibration.name
@@ -328,71 +314,91 @@ class Database_listener:
         ).sort_index()
         return calibration_data, name
 
-    def read_calibration_settings(self, projectpath: pathlib.Path):
-        with open(projectpath / "calibration.json", "r") as f:
-            calibration = json.load(f)
-            if name := calibration.get("name", None):
-                calibration_filepath = calibration_folder / f"{name}.cH2O"
-                return calibration_filepath
+    def read_calibration_settings(
+        self, project: Project_file
+    ) -> Optional[pathlib.Path]:
+        if "calibration.json" not in project:
+            return
+        calibration = project.read_json("calibration.json")
+        if name := calibration.get("name", None):
+            calibration_filepath = calibration_folder / f"{name}.cH2O"
+            return calibration_filepath
 
-    def save_calibration_to_project(self, projectpath):
+    def get_calibration_settings(self) -> Dict:
         name = self.calibration.name if self.calibration.use_calibration else None
-        with open(projectpath / "calibration.json", "w") as f:
-            data = {"name": name}
-            json.dump(data, f, ensure_ascii=False, indent=4, allow_nan=True)
+        return {"name": name}
 
     def save_project_data(self, filepath: pathlib.Path, name: str):
-        paths = self._make_project_folders(name)
+        append = self._can_append_project(filepath)
+        if append:
+            names = self.database_controller.get_project_changes()
+        else:
+            names = self.database_controller.names
 
-        self.save_calibration_to_project(paths["project"])
+        sources = {}
+        with Project_writer(filepath, append=append) as project:
+            project.write_json("calibration.json", self.get_calibration_settings())
+            project.set_samples(self.database_controller.names)
+
+            for name in names:
+                processor = self.database_controller.registry.get_by_name(name)
+                if not isinstance(processor, Lazy_sample):
+                    self._write_sample(project, processor)
+                    continue
+                # Copy samples that are not loaded straight from their project
+                if processor.filepath not in sources:
+                    sources[processor.filepath] = Project_file(processor.filepath)
+                project.copy_sample(sources[processor.filepath], name)
 
-        has_interference = False
+            for source in sources.values():
+                source.close()
 
-        for processor in self.database_controller.spectra:
-            # data = np.column_stack([sample.sample.signal.x, sample.sample.signal.raw])
-            file = paths["data"] / f"{processor.name}"
-            if not file.is_file():
-                np.savez(
-                    file,
-                    x=processor.sample.signal.get("x"),
-                    y=processor.sample.signal.get("raw"),
+            if len(project.index["interference"]) > 0:
+                project.write_interference_settings(
+                    self.database_controller.get_all_interference_settings()
                 )
 
-            file_processed = paths["processed"] / f"{processor.name}"
-            names = ("interference_corrected", "interpolated")
-            data = [processor.sample.signal.get(name) for name in names]
-            processed = {
-                name: vals for name, vals in zip(names, data) if vals is not None
-            }
-
-            if len(processed) > 0:
-                np.savez(file_processed, **processed)
-
-            if not processor.interference_sample:
-                continue
-
-            has_interference = True
-            file_interference = paths["interference"] / f"{processor.name}"
-            np.savez(
-                file_interference,
-                x=processor.interference_sample.sample.signal.get("x"),
-                y=processor.interference_sample.sample.signal.get("raw"),
-            )
+            project.write_settings(self.database_controller.get_all_settings())
+            project.write_results(self.database_controller.results)
+
+    def _can_append_project(self, filepath: pathlib.Path) -> bool:
+        """
+        Only the changes are saved when filepath is the current project and it
+        does not contain too much unused data yet.
+        """
+        if filepath != self.database_controller.project or not filepath.exists():
+            return False
+
+        with Project_file(filepath) as project:
+            if project.is_legacy:
+                return False
+            return project.unused_size < (project.size * max_unused_project_data)
+
+    def _write_sample(self, project: Project_writer, processor) -> None:
+        project.write_spectrum(
+            processor.name,
+            x=processor.sample.signal.get("x"),
+            y=processor.sample.signal.get("raw"),
+        )
 
-        if has_interference:
-            interference_settings = (
-                self.database_controller.get_all_interference_settings()
-            )
-            for name, f in interference_settings.items():
-                f.to_parquet(paths["interference"] / f"{name}.parquet")
+        names = ("interference_corrected", "interpolated")
+        data = [processor.sample.signal.get(name) for name in names]
+        processed = {name: vals for name, vals in zip(names, data) if vals is not None}
 
-        settings = self.database_controller.get_all_settings()
+        if len(processed) > 0:
+            project.write_processed(processor.name, **processed)
+        else:
+            project.remove_processed(processor.name)
 
-        for name, f in settings.items():
-            f.to_parquet(paths["project"] / f"{name}.parquet")
+        if not processor.interference_sample:
+            project.remove_interference(processor.name)
+            return
 
-        with tarfile.open(filepath, mode="w") as tar:
-            tar.add(paths["project"], arcname="")
+        project.write_interference(
+            processor.name,
+            x=processor.interference_sample.sample.signal.get("x"),
+            y=processor.interference_sample.sample.signal.get("raw"),
+        )
 
     def export_results(self, *args, filepath: str):
         on_display_message.send(message="exporting results...", duration=5)
@@ -405,33 +411,6 @@ class Database_listener:
 
         on_display_message.send(message="results exported!")
 
-    def move_project_files(self, filepath, name):
-        # temp_path = temp_folder / name
-        # temp_datapath = temp_path / "data"
-        # temp_interferencepath = temp_datapath / "interference"
-
-        # if not temp_interferencepath.is_dir():
-        #     temp_interferencepath.mkdir(parents=True, exist_ok=True)
-
-        paths = self._make_project_folders(name)
-        to_path = paths["project"]
-
-        with tarfile.open(str(filepath), "r") as tar:
-            for info in tar:
-                path = pathlib.Path(info.name)
-
-                suffix = path.suffix
-
-                if len(suffix) == 0:
-                    continue
-
-                # name = path.stem
-
-                tar.extract(info, path=to_path)
-                # shutil.move(str(path), to_path)
-
-        return paths
-
     def load_project(self, *args, filepath: str):
         self.on_clear_plot.send("new project")
 
@@ -439,86 +418,18 @@ class Database_listener:
         filepath = pathlib.Path(filepath)
         projectname = filepath.stem
 
-        # temp_path = temp_folder / name
-        # temp_datapath = temp_path / "data"
-        # temp_interferencepath = temp_datapath / "interference"
-
-        # paths = self._make_project_folders(name)
-
-        paths = self.move_project_files(filepath=filepath, name=projectname)
-
-        setting_files = glob.glob(os.path.join(paths["project"], "*.parquet"))
-        # f"{paths['project']}{os.sep}*.parquet"
-
-        # spectrum_files = glob.glob(f"{paths['data']}{os.sep}*.sp")  # DELETE
-        spectrum_files = np.array(glob.glob(os.path.join(paths["data"], "*.npz")))
-        spectrum_files = np.sort(spectrum_files)
-        # f"{paths['data']}{os.sep}*.npz"
+        with Project_file(filepath) as project:
+            names = project.sample_names
 
-        interference_files = glob.glob(os.path.join(paths["interference"], "*.npz"))
-        interference_setting_files = glob.glob(
-            os.path.join(paths["interference"], "*.parquet")
-            # f"{paths['interference']}{os.sep}*.parquet"
-        )
-
-        processed_files = glob.glob(os.path.join(paths["processed"], "*.npz"))
-
-        settings_dict = {}
-        for setting in setting_files:
-            name = pathlib.Path(setting).stem
-            try:
-                settings_dict[name] = pd.read_parquet(str(setting)).sort_index()
-            except pa.ArrowInvalid:
-                # header = [[0, 1], "infer"][name == "settings"]  # DELETE
-                settings_dict[name] = pd.read_csv(
-                    str(setting), index_col=[0], header=[0, 1]
+            self.database_controller.__init__()
+            # Add calibration
+            calibration_filepath = self.read_calibration_settings(project=project)
+            if calibration_filepath is not None:
+                self.read_calibration_file(
+                    filepath=calibration_filepath, update_gui=False
                 )
-
-        interference_settings_dict = {}
-        for setting in interference_setting_files:
-            name = pathlib.Path(setting).stem
-            interference_settings_dict[name] = pd.read_parquet(
-                str(setting)
-            ).sort_index()
-
-        names = [pathlib.Path(s).stem for s in spectrum_files]
-        interference_names = [pathlib.Path(s).stem for s in interference_files]
-        processed_names = [pathlib.Path(s).stem for s in processed_files]
-
-        self.database_controller.__init__()
-        # Add calibration
-
-        calibration_filepath = self.read_calibration_settings(
-            projectpath=paths["project"]
-        )
-        if calibration_filepath is not None:
-            self.read_calibration_file(filepath=calibration_filepath, update_gui=False)
-        # with open(paths["project"] / "calibration.json", "r") as f:
-        #     calibration = json.load(f)
-        #     if name := calibration.get("name", None):
-        #         self.read_calibration_file(
-        #             filepath=calibration_folder / f"{name}.cH2O", update_gui=False
-        # )
-        # Read samples
-        self.database_controller.read_files(
-            spectrum_files,
-            names=names,
-            settings=settings_dict,
-            calculate_results=False,
-        )
-        # Read processed spectra
-        self.database_controller.add_processed_spectra(
-            files=processed_files, names=processed_names
-        )
-        # Initialise results
-        self.database_controller.save_results()
-        # Read interference
-        for file, name in zip(interference_files, interference_names):
-            self.database_controller.add_interference(
-                file=file,
-                name=name,
-                settings=interference_settings_dict,
-            )
+            # Read samples
+            self.database_controller.read_project(project)
 
         self.database_controller.set_project(filepath=filepath)
         self.on_change_title.send(title=projectname)
@@ -526,10 +437,6 @@ class Database_listener:
         self.on_update_gui_variables.send(sample_navigation={"samplelist": names})
         self.on_activate_widgets.send()
 
-        # if self.gui.state == GUI_state.DISABLED:
-        #     self.gui.activate_widgets()
-        #     self.gui.set_state(GUI_state.ACTIVE)
-
     def save_sample(self, *args):
         self.database_controller.save_sample()
         self.on_display_message.send(message="sample saved")
@@ -539,7 +446,8 @@ class Database_listener:
         self.on_display_message.send(message="saved all")
 
     def save_samples_to_project(self, *args):
-        self.save_all_samples()
+        self.database_controller.save_all_samples(modified_only=True)
+        self.on_display_message.send(message="saved all")
         if self.database_controller.has_project:
             self.save_project()
 
@@ -565,6 +473,11 @@ class Database_listener:
         folderpath = pathlib.Path(folderpath)
         self.database_controller.export_all(folderpath=folderpath)
 
+    def export_spectra(self, *args, filepath: str):
+        on_display_message.send(message="exporting spectra...", duration=5)
+        self.database_controller.export_spectra(filepath=pathlib.Path(filepath))
+        on_display_message.send(message="spectra exported!")
+
     def subscribe_to_signals(self) -> None:
         self.on_samples_added.connect(self.add_samples)
         self.on_samples_removed.connect(self.remove_samples)
@@ -582,6 +495,7 @@ class Database_listener:
         self.on_export_results.connect(self.export_results)
         self.on_export_sample.connect(self.export_sample)
         self.on_export_all.connect(self.export_all)
+        self.on_export_spectra.connect(self.export_spectra)
 
         self.on_save_project.connect(self.save_project)
         self.on_save_sample.connect(self.save_sample)
@@ -593,69 +507,3 @@ class Database_listener:
         self.on_Ctrl_s.connect(self.save_samples_to_project)
 
         self.on_clean_temp_files.connect(self.clean_temp_files)
-
-
-def get_names_from_files(
-    files: List, previous_names: List[str] = [], delimiter: Optional[str] = None
-) -> List:
-    if delimiter is None:
-        delimiter = app_configuration.data_processing["name_separator"]
-    names = []
-
-    for file in files:
-        try:
-            name = os.path.basename(file)
-        except TypeError:
-            name = file.name
-        if delimiter not in name:
-            names.append(name)
-        else:
-            names.append(name[: name.index(delimiter)])
-
-    names = remove_duplicate_names(names, previous_names=previous_names)
-
-    return names
-
-
-def remove_duplicate_names(
-    names: List[str], previous_names: List[str] = []
-) -> List[str]:
-    new_names = names.copy()
-    last_maximum = {}
-    # Get the maxium suffix valeu for each sample in the current dataset
-    if len(previous_names) > 0:
-        previous_samples = [
-            name[: name.index("@")] if "@" in name else name for name in previous_names
-        ]
-
-        for sample in set(previous_samples):
-            if previous_samples.count(sample) < 2:
-                continue
-            previous_suffix = max(
-                [
-                    int(name[name.index("@") + 1 :])
-                    for name in previous_names
-                    if f"{sample}@" in name
-                ]
-            )
-            last_maximum[sample] = previous_suffix
-    else:
-        previous_samples = []
-
-    # Add a suffix the each name spectrum, start counting from the last maximum suffix value
-    for i, _ in enumerate(new_names):
-        current_name = new_names[i]
-
-        new_occurences = (new_names).count(current_name)
-        previous_occurences = previous_samples.count(current_name)
-
-        if (new_occurences <= 1) & (previous_occurences == 0):
-            continue
-        try:
-            last_suffix = last_maximum[current_name]
-        except KeyError:
-            last_suffix = 0
-
-        new_names[i] = f"{current_name}@{last_suffix + new_occurences}"
-
-    return new_names
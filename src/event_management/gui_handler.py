@@ -9,6 +9,8 @@ class Gui_listener:
 
     on_mouse_movement = bl.signal("mouse moved")
     on_display_message = bl.signal("display message")
+    on_task_progress = bl.signal("task progress")
+    on_schedule = bl.signal("schedule")
     on_change_title = bl.signal("change_title")
 
     on_change_bir_widgets = bl.signal("change bir widgets")
@@ -60,6 +62,14 @@ class Gui_listener:
             int(duration * 1e3), lambda: self.gui.update_variables(infobar={"info": ""})
         )
 
+    def display_progress(self, *args, fraction: float, message: str):
+        self.display_message(
+            message=f"{message} ({fraction:.0%}, esc to cancel)", duration=None
+        )
+
+    def schedule(self, *args, delay: int, func):
+        self.gui.main_window.after(delay, func)
+
     def update_bir_widgets(self, *args, bir_amount):
         self.gui.reset_baseline_widgets(bir_amount=bir_amount)
 
@@ -74,6 +84,8 @@ class Gui_listener:
 
         self.on_mouse_movement.connect(self.update_variables)
         self.on_display_message.connect(self.display_message)
+        self.on_task_progress.connect(self.display_progress)
+        self.on_schedule.connect(self.schedule)
 
         self.on_change_bir_widgets.connect(self.update_bir_widgets)
         self.on_reset_calibration_standards.connect(self.reset_calibration_standards)
@@ -9,6 +9,7 @@ from .. import app_configuration
 on_save_sample = bl.signal("save sample")
 on_reset_sample = bl.signal("reset sample")
 on_save_all = bl.signal("save all")
+on_sweep_baseline = bl.signal("sweep baseline")
 
 
 class Infobar(ttk.Frame):
@@ -23,7 +24,8 @@ class Infobar(ttk.Frame):
         self.widgets = {}
         widgets["infobar"] = self.widgets
 
-        self.create_save_buttons(self, row=0, col=2)
+        self.create_save_buttons(self, row=0, col=3)
+        self.create_sweep_button(self, row=0, col=2)
         self.create_label(self, name="xy", row=0, col=1, sticky="se")
         self.create_label(self, name="info", row=0, col=0, width=50, sticky="sw")
 
@@ -81,3 +83,15 @@ class Infobar(ttk.Frame):
         widgets = [reset, save, save_all]
         for name, widget in zip(names, widgets):
             self.widgets[name] = widget
+
+    def create_sweep_button(self, frame, row, col):
+        sweep = ttk.Button(
+            frame,
+            text="sweep baseline",
+            state=tk.DISABLED,
+            name="sweep_baseline",
+            command=on_sweep_baseline.send,
+        )
+        sweep.grid(row=row, column=col, sticky="nes")
+
+        self.widgets["sweep_baseline"] = sweep
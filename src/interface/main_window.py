@@ -30,6 +30,7 @@ on_Ctrl_s = bl.signal("ctrl+s")
 on_Ctrl_z = bl.signal("ctrl+z")
 on_delete = bl.signal("delete")
 on_switch_tab = bl.signal("switch tab")
+on_cancel_task = bl.signal("cancel task")
 
 on_display_message = bl.signal("display message")
 
@@ -87,6 +88,7 @@ class Main_window(tk.Tk):
         self.bind("<Control-s>", lambda event: on_Ctrl_s.send())
         self.bind("<Control-z>", lambda event: on_Ctrl_z.send())
         self.bind("<Delete>", lambda event: on_delete.send())
+        self.bind("<Escape>", lambda event: on_cancel_task.send())
 
     def set_theme(self):
         self.style = ttk.Style()
@@ -18,6 +18,7 @@ on_save_project = bl.signal("save project")
 on_export_results = bl.signal("export results")
 on_export_sample = bl.signal("export sample")
 on_export_all = bl.signal("export all")
+on_export_spectra = bl.signal("export spectra")
 
 
 on_display_message = bl.signal("display message")
@@ -49,6 +50,7 @@ class IO_menu:
         menu.add_command(label="export results", command=self.export_results)
         menu.add_command(label="export sample", command=self.export_sample)
         menu.add_command(label="export all", command=self.export_all)
+        menu.add_command(label="export all to file", command=self.export_spectra)
         menu.add_separator()
         menu.add_command(label="save project", command=self.save_project)
         menu.add_command(label="save project as", command=self.save_project_as)
@@ -57,6 +59,7 @@ class IO_menu:
             "export results",
             "export sample",
             "export all",
+            "export all to file",
             "save project",
             "save project as",
         ]:
@@ -170,6 +173,21 @@ class IO_menu:
 
         on_export_all.send(folderpath=dir)
 
+    def export_spectra(self):
+        try:
+            f = filedialog.asksaveasfilename(
+                defaultextension=".parquet",
+                filetypes=[("Parquet", "*.parquet"), ("Arrow IPC", "*.arrow")],
+                title="Export all spectra as ...",
+            )
+        except AttributeError:
+            print("Exporting cancelled by user")
+            return
+        if not f:
+            return
+
+        on_export_spectra.send(filepath=f)
+
     def save_project(self):
         on_save_project.send("menu")
 
@@ -195,6 +213,7 @@ class IO_menu:
             "export results",
             "export sample",
             "export all",
+            "export all to file",
             "save project",
             "save project as",
         ]:
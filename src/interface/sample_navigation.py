@@ -8,6 +8,8 @@ from .. import app_configuration
 
 on_sample_change = bl.signal("sample change")
 on_samples_removed = bl.signal("samples removed")
+on_optimize_birs = bl.signal("optimize birs")
+on_load_interference = bl.signal("load interference")
 
 on_delete = bl.signal("delete")
 
@@ -93,6 +95,8 @@ class Sample_navigation(ttk.Frame):
         self.make_button("previous", self.previous_sample, [1, 0], "nes")
         self.make_button("next", self.next_sample, [1, 1])
         self.make_button("delete", self.remove_samples, [2, 0])
+        self.make_button("optimize birs", self.optimize_birs, [2, 1])
+        self.make_button("interference", self.load_interference, [3, 0])
 
     def next_sample(self):
 
@@ -143,3 +147,19 @@ class Sample_navigation(ttk.Frame):
         new_selection = max(index[0] - 1, 0)
         self.select_sample(new_selection)
         self.change_sample((new_selection,))
+
+    def optimize_birs(self, *args):
+        listbox = self.nametowidget("sample_list")
+        selection = listbox.curselection()
+        if not selection:
+            return
+
+        on_optimize_birs.send("navigator", index=list(selection))
+
+    def load_interference(self, *args):
+        listbox = self.nametowidget("sample_list")
+        selection = listbox.curselection()
+        if not selection:
+            return
+
+        on_load_interference.send("navigator", index=list(selection))
@@ -22,6 +22,7 @@ on_remove_interference = bl.signal("remove interference")
 
 on_deconvolve_interference = bl.signal("deconvolve interference")
 on_subtract_interference = bl.signal("subtract interference")
+on_cancel_task = bl.signal("cancel task")
 on_set_processing = bl.signal("set processing")
 
 _font = app_configuration.gui["font"]["family"]
@@ -239,9 +240,19 @@ class Interference_frame(ttk.Frame):
             name="deconvolve",
             command=on_deconvolve_interference.send,
         )
-        deconvolve_button.grid(row=5, column=0, columnspan=2, sticky="ns")
+        deconvolve_button.grid(row=5, column=0, sticky="ns")
+
+        cancel_button = ttk.Button(
+            frame,
+            text="cancel",
+            state=tk.DISABLED,
+            name="cancel",
+            command=on_cancel_task.send,
+        )
+        cancel_button.grid(row=5, column=1, sticky="ns")
 
         self.deconvolution_widgets["deconvolve_spectrum"] = deconvolve_button
+        self.deconvolution_widgets["cancel"] = cancel_button
 
         for i in range(2):
             frame.columnconfigure(i, weight=1)
@@ -4,6 +4,7 @@ import numpy as np
 from matplotlib.transforms import Bbox
 
 from ..interface.screens import Screen
+from ..profiling import profiled
 from .plots import Single_plot
 
 
@@ -33,6 +34,8 @@ class Calibration_plot(Single_plot):
         self.annotation.set_clip_on(True)
 
         self.calibration_stds = None
+        self.outlier_stds = None
+        self.confidence_band = None
         self.names = []
 
         self.mouse_connections = []
@@ -55,12 +58,17 @@ class Calibration_plot(Single_plot):
         else:
             self.name.set_text(name)
 
+    @profiled
     def draw_plot(self, **kwargs):
         H2OSi, H2Oref = kwargs.pop("standards")
         calibration_line = kwargs.pop("calibration_line")
+        confidence_band = kwargs.pop("confidence_band", None)
+        outliers = kwargs.pop("outliers", None)
 
         self.plot_samples(H2OSi=H2OSi, H2Oref=H2Oref)
         self.plot_calibrationline(calibration_line=calibration_line)
+        self.plot_confidence_band(confidence_band=confidence_band)
+        self.plot_outliers(H2OSi=H2OSi, H2Oref=H2Oref, outliers=outliers)
 
         self.fig.canvas.draw_idle()
 
@@ -113,6 +121,39 @@ class Calibration_plot(Single_plot):
                 x, y, "--", linewidth=2, color="darkgrey"
             )
 
+    def plot_confidence_band(self, confidence_band: Optional[np.ndarray]):
+        """
+        Fill between the lower and upper limits of a (x, lower, upper) array
+        """
+        if self.confidence_band is not None:
+            self.confidence_band.remove()
+            self.confidence_band = None
+
+        if confidence_band is None:
+            return
+
+        x, lower, upper = confidence_band
+        self.confidence_band = self.ax.fill_between(
+            x, lower, upper, color="darkgrey", alpha=0.3, linewidth=0, zorder=1
+        )
+
+    def plot_outliers(self, H2OSi, H2Oref, outliers: Optional[np.ndarray]):
+        """
+        Mark standards flagged as outliers
+        """
+        if outliers is None:
+            x, y = [], []
+        else:
+            x, y = np.asarray(H2OSi)[outliers], np.asarray(H2Oref)[outliers]
+
+        if self.outlier_stds is None:
+            (self.outlier_stds,) = self.ax.plot(
+                x, y, "D", mfc="none", mec="red", mew=2, ms=12, zorder=11
+            )
+            return
+
+        self.outlier_stds.set_data(x, y)
+
     def update_annotation(self, ind):
 
         x, y = self.calibration_stds.get_data()
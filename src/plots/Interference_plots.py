@@ -6,6 +6,7 @@ import numpy.typing as npt
 from ramCOH.signal_processing.curves import GaussLorentz
 
 from ..interface.screens import Screen
+from ..profiling import profiled
 from .plot_interaction import construct_polygon_coordinates, drag_polygons
 from .plots import Double_plot
 
@@ -25,6 +26,7 @@ class Subtraction_plot(Double_plot):
         self.mouse_connections = {"interference": [], "subtraction": []}
         self.plot_interactions = {"interference": [], "subtraction": []}
 
+    @profiled
     def draw_plot(self, **kwargs):
 
         interference = kwargs.pop("interference", None)
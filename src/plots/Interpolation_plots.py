@@ -5,6 +5,7 @@ import numpy as np
 import numpy.typing as npt
 
 from ..interface.screens import Screen
+from ..profiling import profiled
 from .plot_interaction import construct_polygon_coordinates, drag_polygons
 from .plots import Single_plot
 
@@ -20,6 +21,7 @@ class Interpolation_plot(Single_plot):
         self.mouse_connections = []
         self.plot_interactions = []
 
+    @profiled
     def draw_plot(self, **kwargs):
 
         interpolation_regions = kwargs.pop("interpolation_regions")
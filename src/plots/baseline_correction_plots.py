@@ -7,6 +7,7 @@ import numpy as np
 import numpy.typing as npt
 
 from ..interface.screens import Screen
+from ..profiling import profiled
 from .plot_interaction import construct_polygon_coordinates, drag_polygons
 from .plots import Double_plot
 
@@ -29,6 +30,7 @@ class Baseline_correction_plot(Double_plot):
         self.mouse_connections = []
         self.plot_interactions = []
 
+    @profiled
     def draw_plot(self, **kwargs):
 
         birs = kwargs.pop("birs")
@@ -0,0 +1,117 @@
+import weakref
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+from matplotlib.lines import Line2D
+
+
+def minmax_decimate(
+    x: npt.NDArray, y: npt.NDArray, xlim: Tuple[float, float], bins: int
+) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Reduce a line to the first, minimum, maximum and last point in each of ``bins``
+    equally wide columns across ``xlim``, so that peaks and troughs are kept.
+
+    x should be sorted. One point on either side of xlim is kept, so that the line
+    continues up to the borders of the axes.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    xmin, xmax = sorted(xlim)
+
+    descending = len(x) > 1 and x[0] > x[-1]
+    if descending:
+        x, y = x[::-1], y[::-1]
+
+    start = max(np.searchsorted(x, xmin, side="left") - 1, 0)
+    stop = min(np.searchsorted(x, xmax, side="right") + 1, len(x))
+    x_window, y_window = x[start:stop], y[start:stop]
+
+    if len(x_window) <= (4 * bins) or xmax <= xmin:
+        return x_window, y_window
+
+    columns = ((x_window - xmin) * (bins / (xmax - xmin))).astype(int)
+    columns = np.clip(columns, -1, bins)
+    # Index of the first point in each column
+    column_starts = np.flatnonzero(np.diff(columns, prepend=columns[0] - 1))
+    column_ids = np.repeat(
+        np.arange(len(column_starts)), np.diff(column_starts, append=len(columns))
+    )
+
+    # y can contain nans
+    mins = np.fmin.reduceat(y_window, column_starts)
+    maxs = np.fmax.reduceat(y_window, column_starts)
+    is_min = np.flatnonzero(y_window == mins[column_ids])
+    is_max = np.flatnonzero(y_window == maxs[column_ids])
+    # First occurrence in each column
+    _, first_min = np.unique(column_ids[is_min], return_index=True)
+    _, first_max = np.unique(column_ids[is_max], return_index=True)
+
+    keep = np.unique(
+        np.concatenate(
+            [
+                column_starts,
+                np.append(column_starts[1:] - 1, len(columns) - 1),
+                is_min[first_min],
+                is_max[first_max],
+            ]
+        )
+    )
+
+    return x_window[keep], y_window[keep]
+
+
+class Line_decimator:
+    """
+    Keep the full resolution data of lines and only hand the lines a min-max
+    decimated version for the visible x-window, at roughly one column per pixel.
+
+    The lines are decimated again when the x-limits of their axes or the size of
+    the figure change. The full resolution data are available through
+    :py:meth:`get_data`.
+    """
+
+    def __init__(self, fig):
+        self.fig = fig
+        self._data = weakref.WeakKeyDictionary()
+        self._connected_axes = weakref.WeakSet()
+
+        self.fig.canvas.mpl_connect("resize_event", self.on_resize)
+
+    def set_data(self, line: Line2D, x: npt.ArrayLike, y: npt.ArrayLike) -> None:
+        x, y = np.asarray(x), np.asarray(y)
+        self._data[line] = (x, y)
+
+        ax = line.axes
+        if ax not in self._connected_axes:
+            ax.callbacks.connect("xlim_changed", self.on_xlim_changed)
+            self._connected_axes.add(ax)
+
+        self._decimate(line, x, y)
+
+    def get_data(self, line: Line2D) -> Tuple[npt.NDArray, npt.NDArray]:
+        try:
+            return self._data[line]
+        except KeyError:
+            return np.asarray(line.get_xdata()), np.asarray(line.get_ydata())
+
+    def update(self, ax=None) -> None:
+        for line, (x, y) in list(self._data.items()):
+            if line.axes is None or (ax is not None and line.axes is not ax):
+                continue
+            self._decimate(line, x, y)
+
+    def _decimate(self, line: Line2D, x: npt.NDArray, y: npt.NDArray) -> None:
+        ax = line.axes
+        if len(x) < 2:
+            line.set_data(x, y)
+            return
+        bins = max(int(ax.bbox.width), 100)
+        line.set_data(*minmax_decimate(x, y, xlim=ax.get_xlim(), bins=bins))
+
+    def on_xlim_changed(self, ax) -> None:
+        self.update(ax)
+
+    def on_resize(self, event) -> None:
+        self.update()
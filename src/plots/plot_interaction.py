@@ -1,5 +1,6 @@
+import time
 from enum import Enum, auto
-from typing import List
+from typing import List, Optional
 
 import blinker as bl
 import numpy as np
@@ -20,8 +21,24 @@ def construct_polygon_coordinates(xmin, xmax):
 
 
 class drag_polygons:
+    """
+    Drag polygons with the mouse and send their new boundaries as settings changes.
+
+    Mouse motion events are coalesced: settings changes are sent at most once every
+    frame_budget milliseconds, counted from the end of the previous recalculation,
+    and always for the latest mouse position. The final position is sent when the
+    mouse button is released. With a frame_budget of 0 every motion event is sent.
+    """
+
+    frame_budget: int = 40
+
     def __init__(
-        self, ax, polygons: List[Polygon], identifier: str, ax_xlimits=[0, 4000]
+        self,
+        ax,
+        polygons: List[Polygon],
+        identifier: str,
+        ax_xlimits=[0, 4000],
+        frame_budget: Optional[int] = None,
     ):
 
         self.ax = ax
@@ -34,6 +51,13 @@ class drag_polygons:
         self.identifier = identifier
         self.ax_xlimits = ax_xlimits
 
+        if frame_budget is not None:
+            self.frame_budget = frame_budget
+
+        self.pending_change = None
+        self._last_change: float = -np.inf
+        self._timer = None
+
     def on_click(self, event):
         """
         calback method for left mouseclick events
@@ -77,7 +101,46 @@ class drag_polygons:
 
         # current_polygon.figure.canvas.draw_idle()
         self.mouse_location = x_new
+        self.pending_change = poly_id
+        self.schedule_bir_change()
+
+    def schedule_bir_change(self):
+        """
+        Send the pending change now if the frame budget has passed, otherwise
+        start a timer for the remaining time
+        """
+        if self._timer is not None:
+            # The timer sends the latest position
+            return
+
+        elapsed = (time.perf_counter() - self._last_change) * 1e3
+        if elapsed >= self.frame_budget:
+            self.send_pending_change()
+            return
+
+        self._timer = self.ax.figure.canvas.new_timer(
+            interval=max(int(self.frame_budget - elapsed), 1)
+        )
+        self._timer.single_shot = True
+        self._timer.add_callback(self.send_pending_change)
+        self._timer.start()
+
+    def send_pending_change(self):
+        self._stop_timer()
+        if self.pending_change is None:
+            return
+
+        poly_id, self.pending_change = self.pending_change, None
         self.send_bir_change(poly_id)
+        # Count from the end of the recalculation, so that slow recalculations
+        # leave time to handle mouse events
+        self._last_change = time.perf_counter()
+
+    def _stop_timer(self):
+        if self._timer is None:
+            return
+        self._timer.stop()
+        self._timer = None
 
     def _get_x_limits(self, polygon_id, buffer):
         if len(self.polygons) == 1:
@@ -136,6 +199,10 @@ class drag_polygons:
         polygon.set_xy(new_coordinates)
 
     def on_release(self, event):
+        # Recalculate with the final position
+        self.send_pending_change()
+        self._last_change = -np.inf
+
         self.dragging = None
         self.width = None
         self.mouse_location = None
@@ -5,7 +5,9 @@ import numpy as np
 
 from .. import app_configuration
 from ..interface.screens import Screen
+from ..profiling import profiled
 from . import plot_layout as pl
+from .decimation import Line_decimator
 
 
 class Plot(Protocol):
@@ -22,7 +24,92 @@ class Plot(Protocol):
         ...
 
 
+class Blit_manager:
+    """
+    Redraw the data of a figure on top of a cached background.
+
+    Lines and patches of the axes are animated: they are left out of full draws of
+    the figure, which only render the static background (axes, ticks, labels and
+    text). The background is copied after every full draw, which happens on resize,
+    zoom, pan and whenever the limits or static elements of the plot change, and
+    :py:meth:`update` only redraws the animated artists on top of it.
+    """
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.background = None
+        self._state = None
+
+        self.fig.canvas.mpl_connect("draw_event", self.on_draw)
+
+    @property
+    def canvas(self):
+        # The canvas is replaced when the figure is embedded in the gui
+        return self.fig.canvas
+
+    @property
+    def valid(self) -> bool:
+        return self.background is not None and self._state == self.get_state()
+
+    def get_state(self) -> Tuple:
+        return (
+            tuple(self.fig.bbox.bounds),
+            tuple(tuple(ax.viewLim.bounds) for ax in self.fig.axes),
+        )
+
+    def get_artists(self, animate: bool = False) -> List:
+        artists = [
+            artist for ax in self.fig.axes for artist in (*ax.patches, *ax.lines)
+        ]
+        if animate:
+            for artist in artists:
+                artist.set_animated(True)
+        else:
+            artists = [artist for artist in artists if artist.get_animated()]
+
+        return sorted(artists, key=lambda artist: artist.get_zorder())
+
+    def invalidate(self):
+        self.background = None
+
+    def on_draw(self, event):
+        if event is not None and event.canvas is not self.canvas:
+            return
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._state = self.get_state()
+        self.draw_artists()
+
+    def draw_artists(self):
+        for artist in self.get_artists():
+            self.fig.draw_artist(artist)
+
+    def update(self) -> bool:
+        """
+        Redraw the animated artists on top of the background.
+
+        Returns
+        -------
+        bool
+            False if the background is not valid and the figure needs a full draw
+        """
+        # Also marks new artists as animated before a full draw
+        artists = self.get_artists(animate=True)
+        if not (self.canvas.supports_blit and self.valid):
+            return False
+
+        self.canvas.restore_region(self.background)
+        for artist in artists:
+            self.fig.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
+        return True
+
+
 class Double_plot:
+
+    # Relative change of the data maximum that is drawn without rescaling the y-axis
+    ylim_tolerance = 0.05
+
     def __init__(self, screen: Screen, xlabel: str, ylabel: str):
 
         self.colors = getattr(pl.colors, app_configuration.gui["plot_theme"])
@@ -51,6 +138,9 @@ class Double_plot:
         # Disconnect key bindings
         self.fig.canvas.mpl_disconnect(self.fig.canvas.manager.key_press_handler_id)
 
+        self.blit = Blit_manager(self.fig)
+        self.decimator = Line_decimator(self.fig)
+
     def setup_ax0(self, title: str, limits: Tuple[int, int]):
 
         ax = self.axs[0]
@@ -91,9 +181,7 @@ class Double_plot:
             keys = lines.keys()
         for key in keys:
             try:
-                line = lines[key][0]
-                line.set_xdata([])
-                line.set_ydata([])
+                self.decimator.set_data(lines[key][0], [], [])
             except KeyError:
                 pass
 
@@ -102,10 +190,17 @@ class Double_plot:
             self.name = self.axs[0].text(
                 0.01, 0.95, sample_name, transform=self.axs[0].transAxes
             )
-        else:
+        elif self.name.get_text() != sample_name:
             self.name.set_text(sample_name)
+        else:
+            return
+        # New sample
+        self.blit.invalidate()
 
+    @profiled
     def draw_plot(self):
+        if self.blit.update():
+            return
         self.fig.canvas.draw_idle()
         self.reset_home()
         # self.fig.canvas.toolbar.push_current()
@@ -138,11 +233,11 @@ class Double_plot:
             y_max = 0
 
             for line in lines.values():
-                x_data = np.array(line[0].get_xdata())
+                x_data, y_data = self.decimator.get_data(line[0])
                 if len(x_data) < 1:
                     continue
                 data_limits = (limits[0] < x_data) & (x_data < limits[1])
-                y_data = line[0].get_ydata()[data_limits]
+                y_data = y_data[data_limits]
                 y_max = max(y_max, max(y_data))
 
             axs_limits[i][3] = y_max
@@ -183,13 +278,13 @@ class Double_plot:
                 ymax.append(y[x_window].max())
 
             try:
-                if np.array_equal(lines[name][0].get_ydata(), y):
+                x_old, y_old = self.decimator.get_data(lines[name][0])
+                if np.array_equal(x_old, x) and np.array_equal(y_old, y):
                     continue
-
-                lines[name][0].set_xdata(x)
-                lines[name][0].set_ydata(y)
             except KeyError:
-                lines[name] = ax.plot(x, y, label=name, color=color, **kwargs)
+                lines[name] = ax.plot([], [], label=name, color=color, **kwargs)
+
+            self.decimator.set_data(lines[name][0], x, y)
                 # if name in ("deconvoluted", "baseline"):
                 #     lines[name][0].set(linewidth=2, alpha=0.5)
 
@@ -197,7 +292,7 @@ class Double_plot:
             return
 
         ymax = max(ymax) * 1.1
-        ax.set_ylim(0, ymax)
+        set_ylimits(ax, ymax, tolerance=self.ylim_tolerance * self.blit.valid)
         if ymax > 2e3:
             ax.ticklabel_format(axis="y", style="scientific", useMathText=True)
 
@@ -219,6 +314,10 @@ class Double_plot:
 
 
 class Single_plot:
+
+    # Relative change of the data maximum that is drawn without rescaling the y-axis
+    ylim_tolerance = 0.05
+
     def __init__(self, screen: Screen, xlabel: str, ylabel: str):
 
         self.colors = getattr(pl.colors, app_configuration.gui["plot_theme"])
@@ -241,6 +340,9 @@ class Single_plot:
         self.fig.supxlabel(xlabel)
         self.fig.supylabel(ylabel)
 
+        self.blit = Blit_manager(self.fig)
+        self.decimator = Line_decimator(self.fig)
+
     def setup_ax(self, limits: Tuple[int, int], title: str = None):
 
         self.ax.set_title(title)
@@ -273,9 +375,7 @@ class Single_plot:
             keys = lines.keys()
         for key in keys:
             try:
-                line = lines[key][0]
-                line.set_xdata([])
-                line.set_ydata([])
+                self.decimator.set_data(lines[key][0], [], [])
             except KeyError:
                 pass
 
@@ -287,10 +387,17 @@ class Single_plot:
                 name,
                 transform=self.ax.transAxes,
             )
-        else:
+        elif self.name.get_text() != name:
             self.name.set_text(name)
+        else:
+            return
+        # New sample
+        self.blit.invalidate()
 
+    @profiled
     def draw_plot(self):
+        if self.blit.update():
+            return
         self.fig.canvas.draw_idle()
         self.reset_home
 
@@ -321,11 +428,11 @@ class Single_plot:
 
             y_max = 0
 
-            x_data = np.array(line[0].get_xdata())
+            x_data, y_data = self.decimator.get_data(line[0])
             if len(x_data) < 1:
                 continue
             data_limits = (ax_limits[0] < x_data) & (x_data < ax_limits[1])
-            y_data = line[0].get_ydata()[data_limits]
+            y_data = y_data[data_limits]
             y_max = max(y_max, max(y_data))
 
             ax_limits[3] = y_max
@@ -349,13 +456,13 @@ class Single_plot:
 
             ymax.append(new_vals[(xmin < x) & (x < xmax)].max())
             try:
-                if np.array_equal(self.lines[name][0].get_ydata(), new_vals):
+                x_old, y_old = self.decimator.get_data(self.lines[name][0])
+                if np.array_equal(x_old, x) and np.array_equal(y_old, new_vals):
                     continue
-
-                self.lines[name][0].set_xdata(x)
-                self.lines[name][0].set_ydata(new_vals)
             except KeyError:
-                self.lines[name] = self.ax.plot(x, new_vals, label=name, color=color)
+                self.lines[name] = self.ax.plot([], [], label=name, color=color)
+
+            self.decimator.set_data(self.lines[name][0], x, new_vals)
 
         self.set_line_formatting()
 
@@ -363,7 +470,7 @@ class Single_plot:
             return
 
         ymax = max(ymax) * 1.1
-        self.ax.set_ylim(0, ymax)
+        set_ylimits(self.ax, ymax, tolerance=self.ylim_tolerance * self.blit.valid)
         if ymax > 2e3:
             self.ax.ticklabel_format(axis="y", style="scientific", useMathText=True)
 
@@ -380,3 +487,14 @@ class Single_plot:
                 self.lines[name][0].set(linewidth=fmt[0], alpha=fmt[1])
             except KeyError:
                 continue
+
+
+def set_ylimits(ax, ymax: float, tolerance: float = 0.0):
+    """
+    Set the y-axis to 0 - ymax, unless ymax is within tolerance of the current
+    limit, so that small changes of the data do not invalidate the plot background
+    """
+    current = ax.get_ylim()[1]
+    if abs(ymax - current) <= (current * tolerance):
+        return
+    ax.set_ylim(0, ymax)
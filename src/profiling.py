@@ -0,0 +1,151 @@
+"""
+Opt-in timing of processing stages, event handlers and plot drawing.
+
+Functions decorated with :py:func:`profiled` and methods of classes decorated with
+:py:func:`profile_methods` record their wall time and call count while the
+profiler is enabled. When it is disabled the only cost is one attribute check
+per call.
+
+Set the environment variable SILICH2O_PROFILE before starting the app to enable
+it: 'summary' prints a table when the app closes, a path to a .json file writes
+a Chrome trace (chrome://tracing, https://ui.perfetto.dev) as well.
+"""
+
+import functools
+import json
+import os
+import pathlib
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+environment_variable = "SILICH2O_PROFILE"
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.trace = False
+
+        # name: [calls, total time, max time]
+        self.stats: Dict[str, List] = {}
+        self.events: List[Dict] = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self, trace: bool = False) -> None:
+        self.trace = trace
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats = {}
+            self.events = []
+        self._start = time.perf_counter()
+
+    def record(self, name: str, start: float, duration: float) -> None:
+        with self._lock:
+            stats = self.stats.get(name, None)
+            if stats is None:
+                self.stats[name] = [1, duration, duration]
+            else:
+                stats[0] += 1
+                stats[1] += duration
+                stats[2] = max(stats[2], duration)
+
+            if self.trace:
+                self.events.append(
+                    {
+                        "name": name,
+                        "ph": "X",
+                        "ts": (start - self._start) * 1e6,
+                        "dur": duration * 1e6,
+                        "pid": os.getpid(),
+                        "tid": threading.get_ident(),
+                    }
+                )
+
+    def summary(self, sort: str = "total") -> str:
+        """
+        Table with calls, total, mean and max time (ms) per name. Times include
+        nested calls.
+        """
+        column = {"calls": 0, "total": 1, "max": 2}[sort]
+        rows = sorted(
+            self.stats.items(), key=lambda item: item[1][column], reverse=True
+        )
+        width = max([len(name) for name in self.stats] + [4]) + 2
+
+        lines = [f"{'name':<{width}}{'calls':>8}{'total':>12}{'mean':>10}{'max':>10}"]
+        for name, (calls, total, maximum) in rows:
+            lines.append(
+                f"{name:<{width}}{calls:>8}{total * 1e3:>12.1f}"
+                f"{total / calls * 1e3:>10.2f}{maximum * 1e3:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def write_trace(self, filepath: Union[str, pathlib.Path]) -> None:
+        with open(filepath, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def enable_from_environment(self) -> None:
+        setting = os.environ.get(environment_variable, "")
+        if not setting:
+            return
+        self.enable(trace=setting.lower().endswith(".json"))
+
+    def report(self) -> None:
+        """
+        Print the summary and write the trace set by SILICH2O_PROFILE
+        """
+        if not self.stats:
+            return
+        print(self.summary(), file=sys.stderr)
+        if self.trace:
+            self.write_trace(os.environ[environment_variable])
+
+
+profiler = Profiler()
+
+
+def profiled(func: Optional[Callable] = None, *, name: Optional[str] = None):
+    """
+    Decorator that times func while the profiler is enabled, under name or the
+    qualified name of func
+    """
+    if func is None:
+        return functools.partial(profiled, name=name)
+
+    label = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.record(label, start, time.perf_counter() - start)
+
+    return wrapper
+
+
+def profile_methods(cls=None, *, exclude=("subscribe_to_signals",)):
+    """
+    Class decorator that applies :py:func:`profiled` to all public methods
+    """
+    if cls is None:
+        return functools.partial(profile_methods, exclude=exclude)
+
+    for attribute, value in list(vars(cls).items()):
+        if attribute.startswith("_") or attribute in exclude:
+            continue
+        if callable(value) and not isinstance(value, type):
+            setattr(cls, attribute, profiled(value))
+
+    return cls
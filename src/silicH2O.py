@@ -10,6 +10,7 @@ from .event_management import (
     Plot_listener,
 )
 from .interface import App_interface
+from .profiling import profiler
 from .spectral_processing import Calibration_processor, Database_controller
 
 on_clean_temp_files = bl.signal("clean temp files")
@@ -17,6 +18,8 @@ on_clean_temp_files = bl.signal("clean temp files")
 
 class silicH2O:
     def __init__(self):
+        profiler.enable_from_environment()
+
         self.samples = Database_controller()
         self.calibration = Calibration_processor()
         self.gui = App_interface(title="Silic-H2O by Thomas van Gerve")
@@ -45,5 +48,6 @@ class silicH2O:
         """
         # self.clean_files()
         on_clean_temp_files.send()
+        profiler.report()
         # close everything
         sys.exit()
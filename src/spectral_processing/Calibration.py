@@ -2,12 +2,14 @@ from typing import Callable, Dict, Optional, Tuple
 
 import blinker as bl
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 import scipy.stats as stat
-import sklearn.metrics as met
 from scipy.stats._stats_mstats_common import LinregressResult
 
+from .calibration_diagnostics import get_diagnostics
 from .database_controller import Database_controller
+from .result_cache import get_key
 
 
 class Calibration_processor:
@@ -20,6 +22,15 @@ class Calibration_processor:
         self.use = pd.Series(dtype=bool, name="use")
 
         self._calibration: Optional[stat.LinregressResult] = None
+        # Covariance matrix of (intercept, slope)
+        self._covariance: Optional[npt.NDArray] = None
+        self._residual_variance: float = 0.0
+        self._SEE: float = 0.0
+        # Key of the standards used for the current fit
+        self._fit_key: Optional[bytes] = None
+        # Set when standards may have changed
+        self._fit_outdated = True
+        self._diagnostics: Optional[Dict] = None
         self.name: Optional[str] = None
         self.use_calibration = False
 
@@ -41,6 +52,7 @@ class Calibration_processor:
             np.nan, index=self._H2OSi.index, name="H2Oreference"
         )
         self.use = pd.Series(False, index=self._H2OSi.index, name="use")
+        self._reset_fit()
 
     def import_calibration(
         self, name: str, H2OSi: pd.Series, H2Oreference: pd.Series, use: pd.Series
@@ -63,18 +75,19 @@ class Calibration_processor:
             if vals is None:
                 continue
             setattr(self, attr, vals)
+        self._reset_fit()
 
     @property
     def H2OSi(self) -> pd.Series:
-        return self._H2OSi[self.use].dropna()
+        return self._H2OSi[self._get_standards_mask()]
 
     @property
     def H2Oreference(self) -> pd.Series:
-        return self._H2Oreference[self.use].dropna()
+        return self._H2Oreference[self._get_standards_mask()]
 
     @property
     def calibration(self) -> LinregressResult:
-        if self._calibration is None:
+        if self._fit_outdated:
             self.calibrate()
         return self._calibration
 
@@ -85,17 +98,35 @@ class Calibration_processor:
         except AttributeError:
             return 0, 0
 
+    @property
+    def covariance(self) -> Optional[npt.NDArray]:
+        """
+        Covariance matrix of intercept and slope
+        """
+        if self.calibration is None:
+            return None
+        return self._covariance
+
     @property
     def SEE(self) -> float:
-        try:
-            SEE = np.sqrt(
-                met.mean_squared_error(
-                    self.H2Oreference, self._calculate_H2O(self.H2OSi)
-                )
+        if self.calibration is None:
+            return 0
+        return self._SEE
+
+    @property
+    def diagnostics(self) -> Optional[Dict]:
+        """
+        Leave-one-out residuals, Cook's distance, outliers and the bootstrap
+        confidence band of the current calibration, see
+        :py:func:`~.calibration_diagnostics.get_diagnostics`
+        """
+        if self.calibration is None or len(self.H2OSi) < 3:
+            return None
+        if self._diagnostics is None:
+            self._diagnostics = get_diagnostics(
+                self.H2OSi.to_numpy(), self.H2Oreference.to_numpy()
             )
-        except (TypeError, ValueError):
-            SEE = 0
-        return SEE
+        return self._diagnostics
 
     @property
     def R2(self) -> float:
@@ -121,25 +152,90 @@ class Calibration_processor:
 
     def set_H2Oreference(self, sample_index, H2O):
         self._H2Oreference.iloc[sample_index] = H2O
+        self._reset_fit()
+
+    def set_use(self, sample_index: int, use: bool) -> None:
+        self.use.iloc[sample_index] = use
+        self._reset_fit()
 
     def set_use_sample(self, sample_name: str, use: bool) -> None:
-        if self.H2Oreference[sample_name] == np.nan:
+        if np.isnan(self._H2Oreference[sample_name]):
             return self.on_display_message.send(message="No H2O set!")
         self.use[sample_name] = use
+        self._reset_fit()
 
     def calibrate(self) -> None:
-        if len(self.H2OSi) < 2:
+        """
+        Fit the calibration line to the standards, unless they have not changed
+        since the last fit
+        """
+        self._fit_outdated = False
+        mask = self._get_standards_mask()
+        H2OSi = self._H2OSi.to_numpy(dtype=float)[mask]
+        H2Oreference = self._H2Oreference.to_numpy(dtype=float)[mask]
+        key = get_key(H2OSi, H2Oreference, names=list(self._H2OSi.index[mask]))
+        if key == self._fit_key:
+            return
+
+        self._fit_key = key
+        self._calibration = None
+        self._covariance = None
+        self._diagnostics = None
+        if len(H2OSi) < 2:
             return self.on_display_message.send(
                 message="Not enough samples in calibration!"
             )
 
-        self._calibration = stat.linregress(self.H2OSi, self.H2Oreference)
+        fit = stat.linregress(H2OSi, H2Oreference)
+        slope_variance = fit.stderr**2
+        covariance = -H2OSi.mean() * slope_variance
+        self._covariance = np.array(
+            [[fit.intercept_stderr**2, covariance], [covariance, slope_variance]]
+        )
+        residuals = H2Oreference - (fit.intercept + H2OSi * fit.slope)
+        degrees_of_freedom = len(H2OSi) - 2
+        self._residual_variance = (
+            (residuals**2).sum() / degrees_of_freedom if degrees_of_freedom > 0 else 0.0
+        )
+        self._calibration = fit
 
-    def _calculate_H2O(self, H2OSi):
-        if self._calibration is None:
+        self._SEE = np.sqrt(
+            np.mean((H2Oreference - self._calculate_H2O(H2OSi)) ** 2)
+        )
+
+    def _calculate_H2O(self, H2OSi, uncertainty: bool = False):
+        """
+        H2O from H2OSi, with uncertainty also the 1 sigma prediction uncertainty
+        from the covariance of the coefficients and the scatter of the standards.
+        """
+        if self.calibration is None:
             return None
 
-        return np.round(self.calibration.intercept + H2OSi * self.calibration.slope, 3)
+        intercept, slope = self.coefficients
+        H2O = np.round(intercept + H2OSi * slope, 3)
+        if not uncertainty:
+            return H2O
+
+        H2OSi = np.asarray(H2OSi, dtype=float)
+        (var_intercept, covariance), (_, var_slope) = self._covariance
+        variance = (
+            var_intercept
+            + 2 * H2OSi * covariance
+            + H2OSi**2 * var_slope
+            + self._residual_variance
+        )
+        return H2O, np.round(np.sqrt(variance), 3)
+
+    def _get_standards_mask(self) -> npt.NDArray:
+        return (
+            self.use.to_numpy(dtype=bool)
+            & np.isfinite(self._H2OSi.to_numpy(dtype=float))
+            & np.isfinite(self._H2Oreference.to_numpy(dtype=float))
+        )
+
+    def _reset_fit(self) -> None:
+        # The fit is checked against the standards again on next use
+        self._fit_outdated = True
 
     # def get_calibration_line(self) -> Callable:
 
@@ -182,8 +278,14 @@ class Calibration_processor:
         }
 
     def get_plotdata(self) -> Dict:
+        diagnostics = self.diagnostics
+        if diagnostics is None:
+            diagnostics = {"band": None, "outliers": None}
+
         return {
             "standards": (self.H2OSi, self.H2Oreference),
             "calibration_line": self._calculate_H2O,
+            "confidence_band": diagnostics["band"],
+            "outliers": diagnostics["outliers"],
             "name": self.name,
         }
@@ -1,5 +1,5 @@
 from itertools import product
-from typing import Union
+from typing import List, Sequence, Union
 
 import numpy as np
 import pandas as pd
@@ -19,7 +19,16 @@ def baseline_multiindex(bir_amount: int):
     return pd.MultiIndex.from_tuples(index)
 
 
-results_columns = ("SiArea", "H2Oarea", "rWS", "noise", "Si_SNR", "H2O_SNR", "H2O")
+results_columns = (
+    "SiArea",
+    "H2Oarea",
+    "rWS",
+    "noise",
+    "Si_SNR",
+    "H2O_SNR",
+    "H2O",
+    "H2O_error",
+)
 
 
 class Settings_DF(pd.DataFrame):
@@ -82,6 +91,54 @@ def _insert_row(df: pd.DataFrame, row: pd.Series):
     return df_new
 
 
+def _insert_rows(df: pd.DataFrame, rows: pd.DataFrame):
+    """
+    Bulk version of _insert_row, columns missing from rows are filled
+    """
+    df_new, rows_new = _match_columns(df, rows)
+
+    return _set_rows(df_new, rows_new)
+
+
+def _set_rows(df: pd.DataFrame, rows: pd.DataFrame):
+    """
+    Write the columns of rows to df, adding rows that are missing. Columns are
+    written one at a time as new arrays, so that they are upcast when needed
+    instead of being set in place.
+    """
+    df_new = df.copy()
+    new_labels = rows.index.difference(df_new.index)
+    if len(new_labels) > 0:
+        df_new = df_new.reindex(df_new.index.append(new_labels))
+    positions = df_new.index.get_indexer(rows.index)
+
+    for column in rows.columns:
+        old, new = df_new[column], rows[column]
+        values = old.to_numpy(dtype=np.result_type(old.dtype, new.dtype), copy=True)
+        values[positions] = new.to_numpy()
+        df_new[column] = values
+
+    return df_new
+
+
+def _regions_frame(regions: List[np.ndarray], index: Sequence) -> pd.DataFrame:
+    """
+    Rows of the baseline dataframes from (n, 2) arrays of region boundaries, padded
+    with nan to the largest amount of regions.
+    """
+    bir_amount = max([r.shape[0] for r in regions] + [0])
+    values = np.full((len(regions), bir_amount * 2), np.nan)
+    for row, r in zip(values, regions):
+        row[: r.size] = r.reshape(-1)
+
+    if bir_amount < 1:
+        columns = pd.MultiIndex.from_arrays([[], []])
+    else:
+        columns = baseline_multiindex(bir_amount)
+
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
 def _get_fill_values(dtypes):
     try:
         return [fill_values[type] for type in dtypes.values]
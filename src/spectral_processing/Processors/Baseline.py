@@ -5,6 +5,7 @@ import pandas as pd
 from ramCOH import RamanProcessing
 
 from .Interpolation_regions import Interpolation_regions
+from .Settings import Baseline_settings
 
 on_display_message = bl.signal("display message")
 
@@ -17,24 +18,40 @@ class Baseline_processor:
         settings: pd.Series,
     ):
         self.sample = sample
-        self.settings = settings
+        self.settings = Baseline_settings.from_series(settings)
         self.interpolation_regions = Interpolation_regions(interpolation_regions)
 
     def apply_settings(self, kwargs) -> None:
 
         smoothing = kwargs.pop("smoothing", None)
         if smoothing:
-            self.settings["smoothing"] = smoothing
+            self.settings.smoothing = smoothing
 
         self.interpolation_regions.set(**kwargs)
 
     def get_settings(self) -> Dict:
 
         birs = self.interpolation_regions.dictionary
-        return {"smoothing": self.settings["smoothing"], **birs}
+        return {"smoothing": self.settings.smoothing, **birs}
 
     def calculate(self) -> None:
         birs = self.interpolation_regions.nested_array
-        smooth_factor = self.settings["smoothing"]
+        smooth_factor = self.settings.smoothing
 
         self.sample.baselineCorrect(baseline_regions=birs, smooth_factor=smooth_factor)
+
+    def get_results(self) -> Dict:
+        return {
+            "baseline": self.sample.baseline,
+            "baseline_corrected": self.sample.signal.get("baseline_corrected"),
+        }
+
+    def set_results(self, results: Dict) -> None:
+        """
+        Apply the results of :py:meth:`calculate` on a sample with the same
+        spectrum and settings
+        """
+        self.sample.birs = self.interpolation_regions.nested_array
+        self.sample.baseline = results["baseline"]
+        self.sample.signal.add("baseline_corrected", results["baseline_corrected"])
+        self.sample.signal.add("baseline", results["baseline"])
@@ -1,11 +1,17 @@
+import copy
+from functools import partial
+from typing import Callable, Dict
+
 import pandas as pd
 import ramCOH as ram
 
+from .Settings import Deconvolution_settings
+
 
 class Deconvolution_processor:
     def __init__(self, sample: ram.RamanProcessing, settings: pd.Series):
         self.sample = sample
-        self.settings = settings
+        self.settings = Deconvolution_settings.from_series(settings)
 
     def get_settings(self):
 
@@ -16,14 +22,41 @@ class Deconvolution_processor:
             self.settings[key] = value
 
     def calculate(self, baseline0=True):
-        if self.sample.noise is None:
-            self.sample.calculate_noise()
-
-        settings = self.get_settings()
-
-        self.sample.deconvolve(
-            y="baseline_corrected",
-            noise=self.sample.noise,
+        self.set_results(self.get_job(baseline0=baseline0)())
+
+    def get_job(self, baseline0=True) -> Callable[[], Dict]:
+        """
+        Deconvolution of a copy of the sample and current settings, that can run on
+        a worker thread. Results are applied with :py:meth:`set_results`
+        """
+        return partial(
+            _deconvolve,
+            sample=copy.deepcopy(self.sample),
+            settings=self.get_settings(),
             baseline0=baseline0,
-            **settings,
         )
+
+    def set_results(self, results: Dict) -> None:
+        self.sample.noise = results["noise"]
+        self.sample.signal.add("deconvoluted", results["deconvoluted"])
+        self.sample.peaks = results["peaks"]
+
+
+def _deconvolve(
+    sample: ram.RamanProcessing, settings: Dict, baseline0: bool = True
+) -> Dict:
+    if sample.noise is None:
+        sample.calculate_noise()
+
+    sample.deconvolve(
+        y="baseline_corrected",
+        noise=sample.noise,
+        baseline0=baseline0,
+        **settings,
+    )
+
+    return {
+        "noise": sample.noise,
+        "deconvoluted": sample.signal.get("deconvoluted"),
+        "peaks": sample.peaks,
+    }
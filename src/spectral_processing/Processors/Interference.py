@@ -1,9 +1,14 @@
-from typing import Dict, Tuple
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
 
 import blinker as bl
+import numpy.typing as npt
 import pandas as pd
 import ramCOH as ram
 
+from ..result_cache import get_array_key, get_key, result_cache
+from .Settings import Interference_settings
+
 on_display_message = bl.signal("display message")
 
 
@@ -11,11 +16,11 @@ class Interference_processor:
     def __init__(self, sample: ram.RamanProcessing, settings: pd.Series):
 
         self.sample = sample
-        self.settings = settings
+        self.settings = Interference_settings.from_series(settings)
 
     @property
     def minimisation_region(self) -> Tuple[float, float]:
-        return list(self.settings.loc[["boundary_left", "boundary_right"]])
+        return [self.settings.boundary_left, self.settings.boundary_right]
 
     def apply_settings(self, **kwargs) -> None:
         names = ("smoothing", "spectrum", "use")
@@ -23,44 +28,90 @@ class Interference_processor:
             val = kwargs.pop(name, None)
             if val is None:
                 continue
-            self.settings[name] = val
+            setattr(self.settings, name, val)
 
         for ID, new_value in kwargs.items():
             location = ["left", "right"][int(ID[-2:]) % 2]
-            self.settings[f"boundary_{location}"] = new_value
+            setattr(self.settings, f"boundary_{location}", new_value)
 
     def get_settings(self) -> Dict:
         boundary_left, boundary_right = self.minimisation_region
         return {
             "bir_00": boundary_left,
             "bir_01": boundary_right,
-            "smoothing": self.settings["smoothing"],
-            "spectrum": self.settings["spectrum"],
-            "use": self.settings["use"],
+            "smoothing": self.settings.smoothing,
+            "spectrum": self.settings.spectrum,
+            "use": self.settings.use,
         }
 
-    def get_interference_spectrum(self, interference: ram.RamanProcessing) -> None:
-
-        spectrum_name = self.settings["spectrum"]
-
-        spectrum = interference.signal.get(spectrum_name)
+    def get_interference_spectrum(
+        self, interference: ram.RamanProcessing
+    ) -> Optional[npt.NDArray]:
+        """
+        Interference spectrum resampled onto the x-axis of the sample.
+
+        Read-only spectra, like those that subtract_interferences shares between
+        samples, are resampled once per spectrum and x-axes, keyed on their
+        contents, and reused by all samples on the same x-axis.
+        """
+        spectrum = getattr(interference.signal, self.settings.spectrum, None)
         if spectrum is None:
             return None
+        if spectrum.flags.writeable:
+            return self.sample.signal.interpolate_spectrum(
+                old_x=interference.signal.x, old_y=spectrum
+            )
+
+        key = get_key(
+            spectrum=get_array_key(spectrum),
+            interference_x=get_array_key(interference.signal.x),
+            x=get_array_key(self.sample.signal.x),
+        )
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached["interference"]
 
-        return self.sample.signal.interpolate_spectrum(
-            old_x=interference.signal.x,
-            old_y=spectrum,
+        resampled = self.sample.signal.interpolate_spectrum(
+            old_x=interference.signal.x, old_y=spectrum
         )
+        resampled.flags.writeable = False
+        result_cache.add(key, {"interference": resampled})
+
+        return resampled
 
     def calculate(self, interference: ram.RamanProcessing) -> bool:
 
+        job = self.get_job(interference)
+        if job is None:
+            return False
+
+        self.set_results(job())
+        return True
+
+    def get_job(
+        self, interference: ram.RamanProcessing
+    ) -> Optional[Callable[[], npt.NDArray]]:
+        """
+        Subtraction with the current settings, that can run on a worker thread.
+        Results are applied with :py:meth:`set_results`
+        """
         interference = self.get_interference_spectrum(interference)
         if interference is None:
             on_display_message.send(message="interference not found", duration=5)
-            return False
+            return None
 
         settings = self.get_settings()
         settings["interval"] = [settings.pop(key) for key in ("bir_00", "bir_01")]
+        settings.pop("use")
 
-        self.sample.subtract_interference(interference=interference, **settings)
-        return True
+        return partial(
+            self.sample.subtract_interference,
+            interference=interference,
+            inplace=False,
+            **settings,
+        )
+
+    def set_results(self, interference_corrected: npt.NDArray) -> None:
+        self.sample.signal.add("interference_corrected", interference_corrected)
+        if self.settings.use:
+            self.sample._processing["interference_corrected"] = True
@@ -6,6 +6,7 @@ import pandas as pd
 from ramCOH import RamanProcessing
 
 from .Interpolation_regions import Interpolation_regions
+from .Settings import Interpolation_settings
 
 on_display_message = bl.signal("display message")
 
@@ -19,7 +20,7 @@ class Interpolation_processor:
     ):
         self.sample = sample
         self.regions = Interpolation_regions(regions, max_width=150)
-        self.settings = settings
+        self.settings = Interpolation_settings.from_series(settings)
 
         self.results = None
 
@@ -29,14 +30,14 @@ class Interpolation_processor:
             val = kwargs.pop(name, None)
             if val is None:
                 continue
-            self.settings[name] = val
+            setattr(self.settings, name, val)
 
         self.regions.set(**kwargs)
 
     def get_settings(self) -> Dict:
         settings = {
-            "smoothing": self.settings["smoothing"],
-            "use": self.settings["use"],
+            "smoothing": self.settings.smoothing,
+            "use": self.settings.use,
         }
         regions = self.regions.dictionary
 
@@ -65,6 +66,6 @@ class Interpolation_processor:
 
         return {
             "interpolate": self.regions.nested_array if regions is None else regions,
-            "smooth_factor": self.settings["smoothing"],
-            "use": self.settings["use"] if regions is None else False,
+            "smooth_factor": self.settings.smoothing,
+            "use": self.settings.use if regions is None else False,
         }
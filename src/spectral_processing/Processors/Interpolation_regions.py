@@ -1,84 +1,145 @@
-from typing import Dict
+from typing import Dict, Optional
 
 import blinker as bl
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
 
+from ..Dataframes import baseline_multiindex
+
 on_display_message = bl.signal("display message")
 
 
 class Interpolation_regions:
+    """
+    Interpolation regions as an (n, 2) array of [from, to] boundaries.
+
+    Regions are kept sorted and non-overlapping. The (region, from/to) MultiIndex
+    Series of the dataframes is only used to read and write settings.
+    """
+
+    # Smallest width of a region
+    min_width: float = 1.0
+    # Upper limit of the spectrum for new regions after the last region
+    x_max: float = 4e3
+
     def __init__(self, regions: pd.Series, max_width: int = 30):
-        self._regions = regions.dropna().copy()
         self.max_width = max_width
+        self.set_series(regions)
 
     @property
     def amount(self) -> int:
-        return len(self._regions.dropna()) // 2
+        return self._regions.shape[0]
 
     @property
     def dictionary(self) -> Dict:
-        return {
-            f"bir_{idx:02d}": int(value)
-            for idx, value in enumerate(self._regions.dropna().values)
-        }
+        values = self._regions.reshape(-1).astype(int).tolist()
+        return {f"bir_{idx:02d}": value for idx, value in enumerate(values)}
 
     @property
     def series(self) -> pd.Series:
-        return self._regions.dropna()
+        return pd.Series(
+            self._regions.reshape(-1),
+            index=baseline_multiindex(self.amount),
+            name=self.name,
+        )
 
     @property
     def nested_array(self) -> npt.NDArray:
-        return np.reshape(self._regions.dropna().values, (self.amount, 2))
+        """
+        Read-only view of the regions
+        """
+        regions = self._regions.view()
+        regions.flags.writeable = False
+        return regions
 
     def set(self, **kwargs):
-        for bir, new_value in kwargs.items():
-            if "bir" not in bir:
-                continue
-            index = int(bir[-2:])
-            i = index // 2
-            j = ["from", "to"][index % 2]
-            self._regions.loc[(str(i), j)] = int(new_value)
+        birs = {
+            int(bir[-2:]): int(value) for bir, value in kwargs.items() if "bir" in bir
+        }
+        if not birs:
+            return
 
-    def set_series(self, regions: pd.Series):
+        rows = max(self.amount, max(birs) // 2 + 1)
+        if rows == self.amount:
+            regions = self._regions.copy()
+        else:
+            regions = np.full((rows, 2), np.nan)
+            regions[: self.amount] = self._regions
+        flat = regions.reshape(-1)
+        for index, value in birs.items():
+            flat[index] = value
+        if rows != self.amount:
+            # Drop regions that only have one boundary
+            regions = regions[~np.isnan(regions).any(axis=1)]
+
+        if not self.is_valid(regions):
+            on_display_message.send(message="interpolation regions overlap!")
+            return
+
+        self._regions = np.ascontiguousarray(regions)
 
-        self._regions = regions.copy()
+    def set_array(self, regions: npt.ArrayLike) -> None:
+        """
+        Replace all regions by an (n, 2) array of [from, to] boundaries
+        """
+        regions = np.array(regions, dtype=float).reshape(-1, 2)
+        if not self.is_valid(regions):
+            raise ValueError("interpolation regions overlap")
+        self._regions = regions
+
+    def set_series(self, regions: pd.Series):
+        self.name = regions.name
+        self._regions = _array_from_series(regions)
 
     def add(self, index: int) -> None:
-        min_value = self._regions.loc[str(index)].values[1]
-        if self.amount == 1:
-            max_value = 4e3
+        """
+        Add a region between region index and the next one
+        """
+        min_value = self._regions[index, 1]
+        if index + 1 < self.amount:
+            max_value = self._regions[index + 1, 0]
         else:
-            max_value = self._regions.loc[str(index + 1)].values[0]
+            max_value = self.x_max
 
         max_allowed_width = (max_value - 5) - (min_value + 5)
         if max_allowed_width < 0:
             on_display_message.send(message="new bir does not fit!")
             return
         set_width = min(self.max_width, max_allowed_width)
-        center = np.mean([max_value, min_value])
+        center = (max_value + min_value) / 2
 
-        left_boundary = center - (set_width / 2)
-        right_boundary = center + (set_width / 2)
+        new_region = [center - (set_width / 2), center + (set_width / 2)]
+        self._regions = np.insert(self._regions, index + 1, new_region, axis=0)
 
-        for i in reversed(range(index + 1, self.amount)):
-            values = self._regions.loc[str(i)].values
-            self._regions.loc[(str(i + 1), "from")] = values[0]
-            self._regions.loc[(str(i + 1), "to")] = values[1]
+    def remove(self, index: int) -> None:
+        self._regions = np.delete(self._regions, index, axis=0)
 
-        # self._regions.loc[(str(index + 1))] = (
-        #     int(left_boundary),
-        #     int(right_boundary),
-        # )
-        self._regions.loc[(str(index + 1), "from")] = left_boundary
-        self._regions.loc[(str(index + 1), "to")] = right_boundary
+    @classmethod
+    def is_valid(cls, regions: npt.NDArray, min_width: Optional[float] = None) -> bool:
+        """
+        True if all regions are at least min_width wide and do not overlap
+        """
+        if min_width is None:
+            min_width = cls.min_width
+        widths = regions[:, 1] - regions[:, 0]
+        gaps = regions[1:, 0] - regions[:-1, 1]
 
-    def remove(self, index: int) -> None:
+        return bool(np.all(widths >= min_width) and np.all(gaps >= 0))
+
+
+def _array_from_series(regions: pd.Series) -> npt.NDArray:
+    """
+    (n, 2) array of [from, to] boundaries from a (region, from/to) MultiIndex Series
+    """
+    regions = regions.dropna()
+    if len(regions) == 0:
+        return np.empty((0, 2), dtype=float)
+
+    region_ids = regions.index.get_level_values(0).astype(int).to_numpy()
+    to = (regions.index.get_level_values(1) == "to").astype(int)
+    order = np.lexsort((to, region_ids))
 
-        for i in range(index, self.amount - 1):  # - 1
-            values = self._regions.loc[str(i + 1)].values
-            self._regions.loc[(str(i), ["from", "to"])] = values
+    values = regions.to_numpy(dtype=float)[order]
 
-        # drop unused region
-        self._regions.drop(self._regions.index[-2:], inplace=True)
+    return np.ascontiguousarray(values.reshape(-1, 2))
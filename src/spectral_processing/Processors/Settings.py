@@ -0,0 +1,155 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "Settings_record",
+    "Baseline_settings",
+    "Interpolation_settings",
+    "Interference_settings",
+    "Deconvolution_settings",
+    "to_series",
+    "to_frame",
+]
+
+
+class Settings_record:
+    """
+    Processing settings of one sample as plain attributes.
+
+    Settings are read and written as attributes, or by name like a dictionary.
+    Conversion to and from pandas only happens at the persistence boundary, with
+    :py:meth:`from_series` and :py:func:`to_series`.
+    """
+
+    __slots__ = ()
+    defaults: Dict[str, Any] = {}
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name, self.defaults.get(name, None)))
+
+    @classmethod
+    def from_series(
+        cls, settings: Union[pd.Series, Dict, "Settings_record"]
+    ) -> "Settings_record":
+        if isinstance(settings, Settings_record):
+            return settings.copy()
+        return cls(
+            **{
+                name: _to_python(settings.get(name, cls.defaults.get(name, None)))
+                for name in cls.__slots__
+            }
+        )
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        try:
+            setattr(self, name, _to_python(value))
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.values() == other.values()
+
+    def __repr__(self) -> str:
+        settings = ", ".join(f"{name}={value!r}" for name, value in self.items())
+        return f"{type(self).__name__}({settings})"
+
+    def __getstate__(self) -> Tuple:
+        return self.values()
+
+    def __setstate__(self, state: Tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+
+    def values(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self.__slots__, self.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def copy(self) -> "Settings_record":
+        new = object.__new__(type(self))
+        new.__setstate__(self.values())
+        return new
+
+
+class Baseline_settings(Settings_record):
+    __slots__ = ("smoothing",)
+    defaults = {"smoothing": 1}
+
+
+class Interpolation_settings(Settings_record):
+    __slots__ = ("use", "smoothing")
+    defaults = {"use": False, "smoothing": 1}
+
+
+class Interference_settings(Settings_record):
+    __slots__ = ("use", "boundary_left", "boundary_right", "smoothing", "spectrum")
+    defaults = {"use": False, "smoothing": 1, "spectrum": "baseline_corrected"}
+
+
+class Deconvolution_settings(Settings_record):
+    __slots__ = ("peak_height", "fit_window", "residuals_threshold", "max_iterations")
+
+
+def to_series(groups: Dict[str, Settings_record]) -> pd.Series:
+    """
+    Combine settings into one row of the settings dataframes, with
+    (group, name) MultiIndex
+    """
+    names = tuple((group, tuple(settings.keys())) for group, settings in groups.items())
+    values = [value for settings in groups.values() for value in settings.values()]
+
+    return pd.Series(values, index=_get_index(names), dtype=object)
+
+
+def to_frame(rows: List[Dict[str, Settings_record]], index: Sequence) -> pd.DataFrame:
+    """
+    Combine the settings of several samples into rows of the settings dataframes,
+    all samples should have the same groups.
+    """
+    if len(rows) < 1:
+        return pd.DataFrame(index=index)
+    names = tuple(
+        (group, tuple(settings.keys())) for group, settings in rows[0].items()
+    )
+    values = [
+        [value for settings in groups.values() for value in settings.values()]
+        for groups in rows
+    ]
+
+    return pd.DataFrame(values, index=index, columns=_get_index(names))
+
+
+@lru_cache(maxsize=None)
+def _get_index(names: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> pd.MultiIndex:
+    return pd.MultiIndex.from_tuples(
+        [(group, name) for group, group_names in names for name in group_names]
+    )
+
+
+def _to_python(value: Any) -> Any:
+    # numpy scalars from dataframes to python types
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
@@ -3,3 +3,4 @@ from .Deconvolution import Deconvolution_processor
 from .Interference import Interference_processor
 from .Interpolation import Interpolation_processor
 from .Interpolation_regions import Interpolation_regions
+from .Settings import *
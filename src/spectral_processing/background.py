@@ -0,0 +1,142 @@
+import io
+import queue
+import re
+import sys
+import threading
+from contextlib import redirect_stdout
+from typing import Any, Callable, Optional
+
+# ramCOH prints lines like 'processing range 02/10' during deconvolution
+_progress_pattern = re.compile(r"(\d+)\s*/\s*(\d+)")
+
+
+class Task_cancelled(Exception):
+    pass
+
+
+class Background_task:
+    """
+    Run a function on a worker thread.
+
+    Progress, results and errors are queued by the worker and handed to the
+    callbacks by :py:meth:`poll`, so that they run on the thread that polls the
+    task, e.g. the Tk main loop. Text printed on the worker thread is parsed for
+    progress like 'processing range 02/10'. A cancelled task stops at the next
+    progress update and its result is discarded.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[], Any],
+        on_done: Callable[[Any], None],
+        on_progress: Optional[Callable[[float, str], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        on_cancel: Optional[Callable[[], None]] = None,
+    ):
+        self.func = func
+        self.callbacks = {
+            "done": on_done,
+            "progress": on_progress,
+            "error": on_error,
+            "cancelled": on_cancel,
+        }
+
+        self._queue: queue.Queue = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.finished = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def progress(self, fraction: float, message: str = "") -> None:
+        """
+        Report progress from the worker thread, raises Task_cancelled when the
+        task has been cancelled
+        """
+        if self.cancelled:
+            raise Task_cancelled
+        self._queue.put(("progress", (fraction, message)))
+
+    def _run(self) -> None:
+        try:
+            with redirect_stdout(_Progress_writer(self, sys.stdout)):
+                result = self.func()
+            if self.cancelled:
+                raise Task_cancelled
+        except Task_cancelled:
+            self._queue.put(("cancelled", None))
+        except Exception as error:
+            self._queue.put(("error", error))
+        else:
+            self._queue.put(("done", result))
+
+    def poll(self) -> bool:
+        """
+        Hand queued progress and results to the callbacks.
+
+        Returns
+        -------
+        bool
+            True while the task is still running
+        """
+        while True:
+            try:
+                event, value = self._queue.get_nowait()
+            except queue.Empty:
+                return not self.finished
+
+            if event == "done" and self.cancelled:
+                event = "cancelled"
+            callback = self.callbacks[event]
+            if event == "progress":
+                if callback is not None and not self.cancelled:
+                    callback(*value)
+                continue
+
+            self.finished = True
+            if callback is None:
+                if event == "error":
+                    raise value
+                continue
+            if event == "cancelled":
+                callback()
+            else:
+                callback(value)
+
+
+class _Progress_writer(io.TextIOBase):
+    """
+    Stand-in for stdout that turns text printed on the worker thread into progress
+    """
+
+    def __init__(self, task: Background_task, stream):
+        self.task = task
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        if threading.current_thread() is not self.task._thread:
+            return self.stream.write(text)
+
+        if self.task.cancelled:
+            raise Task_cancelled
+
+        if match := _progress_pattern.search(text):
+            current, total = (int(i) for i in match.groups())
+            # Printed before the range is processed
+            self.task.progress((current - 1) / total, text.strip())
+
+        return len(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
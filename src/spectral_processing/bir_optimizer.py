@@ -0,0 +1,166 @@
+"""
+Automatic placement of baseline interpolation regions (BIR).
+
+Every region is moved within a search window around its current position to
+where the spectrum is lowest and flattest: the smallest residuals of a straight
+line fitted inside the region, plus penalties on the curvature of the smoothed
+spectrum and on the height of the region above the lowest candidate. All
+candidate positions of a region are scored at once from cumulative sums of the
+spectrum, so that the cost does not depend on the width of the regions.
+
+Search windows stop halfway between neighbouring regions, so optimized regions
+keep their order and never overlap.
+"""
+
+import numpy as np
+import numpy.typing as npt
+
+from .Processors import Interpolation_regions
+
+
+def optimize_regions(
+    x: npt.ArrayLike,
+    y: npt.ArrayLike,
+    regions: npt.ArrayLike,
+    margin: float = 50.0,
+    step: float = 1.0,
+    curvature_weight: float = 1.0,
+    height_weight: float = 1.0,
+    smoothing_points: int = 5,
+    min_points: int = 3,
+) -> npt.NDArray:
+    """
+    Regions, as an (n, 2) array of [from, to] boundaries, shifted by at most
+    margin to where the spectrum is lowest and flattest. Region widths are kept,
+    candidate positions are step apart.
+
+    Regions without a valid candidate keep their position. If the result does
+    not pass :py:meth:`Interpolation_regions.is_valid`, the original regions are
+    returned.
+    """
+    regions = np.array(regions, dtype=float).reshape(-1, 2)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    order = np.argsort(x)
+    x, y = x[order], y[order]
+
+    sums = _cumulative_sums(x, y, smoothing_points)
+    lower, upper = _search_windows(regions, margin)
+
+    optimized = regions.copy()
+    for i, ((start, end), low, high) in enumerate(zip(regions, lower, upper)):
+        width = end - start
+        starts = start + step * np.arange(
+            np.ceil((low - start) / step), np.floor((high - end) / step) + 1
+        )
+        if len(starts) < 1:
+            continue
+        scores = score_candidates(
+            x,
+            sums,
+            starts,
+            starts + width,
+            curvature_weight=curvature_weight,
+            height_weight=height_weight,
+            min_points=min_points,
+        )
+        if not np.isfinite(scores).any():
+            continue
+        best = starts[np.argmin(scores)]
+        optimized[i] = best, best + width
+
+    if not Interpolation_regions.is_valid(optimized):
+        return regions
+
+    return optimized
+
+
+def score_candidates(
+    x: npt.NDArray,
+    sums: npt.NDArray,
+    starts: npt.NDArray,
+    ends: npt.NDArray,
+    curvature_weight: float = 1.0,
+    height_weight: float = 1.0,
+    min_points: int = 3,
+) -> npt.NDArray:
+    """
+    Scores of candidate regions [starts, ends], lower is better.
+
+    The score is the residual variance of a straight line fitted inside the
+    region relative to the noise of the spectrum, plus curvature_weight times the
+    mean absolute curvature relative to the median curvature of the spectrum,
+    plus height_weight times the mean intensity above that of the lowest
+    candidate, in units of noise. Regions with fewer than min_points points
+    score inf.
+    """
+    left = np.searchsorted(x, starts, side="left")
+    right = np.searchsorted(x, ends, side="right")
+    n, Sx, Sy, Sxx, Sxy, Syy, Sc = sums[:, right] - sums[:, left]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Vxx = Sxx - Sx**2 / n
+        Vxy = Sxy - Sx * Sy / n
+        Vyy = Syy - Sy**2 / n
+        residuals = np.clip(Vyy - Vxy**2 / Vxx, 0, None) / (n - 2)
+        curvature = Sc / n
+        height = Sy / n
+
+    valid = n >= max(min_points, 3)
+    if not valid.any():
+        return np.full(len(starts), np.inf)
+    height = height - height[valid].min()
+    scores = residuals + curvature_weight * curvature + height_weight * height
+
+    return np.where(valid, scores, np.inf)
+
+
+def _cumulative_sums(
+    x: npt.NDArray, y: npt.NDArray, smoothing_points: int
+) -> npt.NDArray:
+    """
+    Cumulative sums, starting at 0, of the terms needed to fit lines and average
+    curvature over any range of points: n, x, y, x**2, xy, y**2 and curvature
+    """
+    # Scale so that residuals are relative to the noise and sums stay accurate
+    noise = _noise(y)
+    xs = (x - x.mean()) / (x.std() or 1.0)
+    ys = (y - y.mean()) / noise
+
+    curvature = np.abs(np.gradient(np.gradient(_smooth(ys, smoothing_points), xs), xs))
+    curvature /= np.median(curvature) or 1.0
+
+    terms = np.stack([np.ones_like(xs), xs, ys, xs**2, xs * ys, ys**2, curvature])
+    sums = np.zeros((terms.shape[0], terms.shape[1] + 1))
+    np.cumsum(terms, axis=1, out=sums[:, 1:])
+
+    return sums
+
+
+def _search_windows(regions: npt.NDArray, margin: float):
+    """
+    Lower and upper limits of the search window of each region, at most margin
+    away from the region and not past the middle of the gaps to its neighbours
+    """
+    lower = regions[:, 0] - margin
+    upper = regions[:, 1] + margin
+    middles = (regions[1:, 0] + regions[:-1, 1]) / 2
+    lower[1:] = np.maximum(lower[1:], middles)
+    upper[:-1] = np.minimum(upper[:-1], middles)
+
+    return lower, upper
+
+
+def _smooth(y: npt.NDArray, points: int) -> npt.NDArray:
+    if points < 2:
+        return y
+    kernel = np.ones(points) / points
+    return np.convolve(np.pad(y, points // 2, mode="edge"), kernel, mode="valid")[
+        : len(y)
+    ]
+
+
+def _noise(y: npt.NDArray) -> float:
+    # Robust standard deviation of point to point differences
+    noise = np.median(np.abs(np.diff(y))) / (0.6745 * np.sqrt(2))
+    return float(noise) or 1.0
@@ -0,0 +1,115 @@
+"""
+Diagnostics of a linear calibration: leave-one-out residuals, Cook's distance and
+bootstrap confidence bands of the calibration line.
+
+Everything is calculated in closed form with numpy. The bootstrap fits all
+resamples at once as rows of one (resamples, standards) array.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+
+def fit_lines(x: npt.NDArray, y: npt.NDArray) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Least squares intercepts and slopes of y = intercept + slope * x along the last
+    axis of x and y.
+
+    Rows without spread in x get nan coefficients.
+    """
+    x_mean = x.mean(axis=-1, keepdims=True)
+    y_mean = y.mean(axis=-1, keepdims=True)
+    dx = x - x_mean
+    Sxx = (dx**2).sum(axis=-1)
+    Sxy = (dx * (y - y_mean)).sum(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = np.where(Sxx > 0, Sxy / Sxx, np.nan)
+    intercepts = y_mean[..., 0] - slopes * x_mean[..., 0]
+
+    return intercepts, slopes
+
+
+def leave_one_out(x: npt.NDArray, y: npt.NDArray) -> Dict[str, npt.NDArray]:
+    """
+    Leverage, leave-one-out residuals and Cook's distance of each standard.
+
+    Leave-one-out residuals are the residuals of each standard to the line fitted
+    without it, e / (1 - h), with e the residuals and h the leverages of the full
+    fit.
+    """
+    n = len(x)
+    intercept, slope = fit_lines(x, y)
+    residuals = y - (intercept + slope * x)
+
+    dx = x - x.mean()
+    leverage = 1 / n + dx**2 / (dx**2).sum()
+    residual_variance = (residuals**2).sum() / (n - 2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loo_residuals = residuals / (1 - leverage)
+        cooks_distance = (
+            residuals**2 / (2 * residual_variance) * leverage / (1 - leverage) ** 2
+        )
+
+    return {
+        "leverage": leverage,
+        "residuals": residuals,
+        "loo_residuals": loo_residuals,
+        "cooks_distance": cooks_distance,
+    }
+
+
+def bootstrap_band(
+    x: npt.NDArray,
+    y: npt.NDArray,
+    x_band: npt.NDArray,
+    resamples: int = 2000,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Lower and upper confidence limits of the calibration line at x_band, from
+    the percentiles of lines fitted to resamples of the standards
+    """
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, len(x), size=(resamples, len(x)))
+    intercepts, slopes = fit_lines(x[indices], y[indices])
+
+    lines = intercepts[:, None] + slopes[:, None] * x_band[None, :]
+    tail = (1 - confidence) / 2 * 100
+    lower, upper = np.nanpercentile(lines, [tail, 100 - tail], axis=0)
+
+    return lower, upper
+
+
+def get_diagnostics(
+    x: npt.ArrayLike,
+    y: npt.ArrayLike,
+    resamples: int = 2000,
+    confidence: float = 0.95,
+    band_points: int = 50,
+    seed: Optional[int] = 0,
+) -> Dict[str, npt.NDArray]:
+    """
+    Leave-one-out statistics per standard, standards with Cook's distance above
+    4 / n as outliers and the bootstrap confidence band over the range of the
+    standards.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) < 3:
+        raise ValueError("at least 3 standards needed")
+
+    diagnostics = leave_one_out(x, y)
+    diagnostics["outliers"] = diagnostics["cooks_distance"] > (4 / len(x))
+
+    x_band = np.linspace(x.min(), x.max(), band_points)
+    lower, upper = bootstrap_band(
+        x, y, x_band, resamples=resamples, confidence=confidence, seed=seed
+    )
+    diagnostics["band"] = np.stack([x_band, lower, upper])
+
+    return diagnostics
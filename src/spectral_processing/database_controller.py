@@ -1,9 +1,12 @@
+import copy
 import pathlib
 import warnings as w
-from typing import Callable, Dict, List, Optional
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 import blinker as bl
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 from .. import app_configuration
@@ -11,19 +14,36 @@ from .Dataframes import (
     Baseline_DF,
     Results_DF,
     Settings_DF,
-    _insert_row,
+    _insert_rows,
     _match_columns,
+    _regions_frame,
+    _set_rows,
 )
-from .sample_processing import Sample_proccessor, h2o_processor
+from .parallel import process_imap, process_map, thread_map
+from .parameter_sweep import sweep_samples
+from .Processors import to_frame
+from .project_file import (
+    Project_file,
+    interference_member,
+    processed_member,
+    spectrum_member,
+)
+from .result_cache import get_key
+from .sample_processing import Lazy_sample, Sample_proccessor, h2o_processor
+from .sample_registry import Sample_registry
+from .spectra_file import Spectra_writer, spectrum_columns
+from .spectrum_io import read_spectrum
 
 on_display_message = bl.signal("display message")
 
 
 class Database_controller:
+
+    # Samples exported at a time, samples that are not loaded are loaded per chunk
+    export_chunksize: int = 256
+
     def __init__(self):
-        self.files: np.ndarray = np.array([], dtype=str)
-        self.names: np.ndarray = np.array([], dtype=str)
-        self.spectra: np.ndarray = np.array([], dtype=h2o_processor)
+        self.registry = Sample_registry()
 
         self.current_sample_index: Optional[int] = None
 
@@ -43,6 +63,23 @@ class Database_controller:
         self.calculate_H2O: Callable = lambda *args, **kwargs: None
 
         self.project = None
+        # Samples that need to be rewritten on the next project save
+        self.project_changes: Set[str] = set()
+
+        # Worker processes for reading and calculating samples, 0 for all cores
+        self.processes: int = app_configuration.general.get("processes", 1)
+
+    @property
+    def spectra(self) -> np.ndarray:
+        return self.registry.spectra
+
+    @property
+    def names(self) -> np.ndarray:
+        return self.registry.names
+
+    @property
+    def files(self) -> np.ndarray:
+        return self.registry.files
 
     @property
     def current_sample(self) -> h2o_processor:
@@ -55,8 +92,13 @@ class Database_controller:
     @property
     def sample_saved(self):
         sample = self.current_sample
-        name = sample.name
-        return np.array_equal(self.results.loc[name], sample.results)
+        # H2O and its uncertainty are only calculated in the results dataframe
+        columns = sample.results.index.drop("H2O")
+        return np.array_equal(
+            self.results.loc[sample.name, columns].to_numpy(dtype=float),
+            sample.results[columns].to_numpy(dtype=float),
+            equal_nan=True,
+        )
 
     @sample_saved.setter
     def sample_saved(self):
@@ -70,6 +112,10 @@ class Database_controller:
     #     return self.settings[("calibration", "H2Oreference")]
 
     def set_calibration(self, name: str, calibration: Callable):
+        """
+        calibration returns H2O from H2OSi, or H2O and its 1 sigma uncertainty
+        with uncertainty=True
+        """
         self.calibration = name
         self.calculate_H2O = calibration
 
@@ -78,8 +124,17 @@ class Database_controller:
         self.calculate_H2O = lambda *args, **kwargs: None
 
     def get_sample(self, index: int) -> h2o_processor:
+        sample = self.registry.get(index)
+        if isinstance(sample, Lazy_sample):
+            sample = self._load_sample(index)
+
+        return sample
+
+    def get_sample_by_name(self, name: str) -> h2o_processor:
+        return self.get_sample(self.registry.index(name))
 
-        return self.spectra[index]
+    def is_loaded(self, index: int) -> bool:
+        return not isinstance(self.registry.get(index), Lazy_sample)
 
     def change_birs(self, action: str, index: int, tab: str):
 
@@ -125,40 +180,59 @@ class Database_controller:
         calculate_results=True,
     ) -> None:
 
-        old_files = len(self.files)
+        self._add_samples(
+            sources=files,
+            names=names,
+            files=files,
+            settings=settings,
+            calculate_results=calculate_results,
+        )
+
+    def add_spectra(
+        self,
+        spectra: List[Tuple[npt.NDArray, npt.NDArray]],
+        names: List[str],
+        files: Optional[List] = None,
+        settings: Optional[Dict] = None,
+        calculate_results=True,
+    ) -> None:
+        """
+        Add samples from spectra that are already in memory as (x, y)
+        """
+        if files is None:
+            files = names
+
+        self._add_samples(
+            sources=spectra,
+            names=names,
+            files=files,
+            settings=settings,
+            calculate_results=calculate_results,
+        )
 
-        self.files = np.append(self.files, files)
-        self.names = np.append(self.names, names)
+    def _add_samples(
+        self,
+        sources: List,
+        names: List[str],
+        files: List,
+        settings: Optional[Dict],
+        calculate_results: bool,
+    ) -> None:
 
         self.add_settings_results(names=names, settings=settings)
 
-        for idx, (file, name) in enumerate(
-            zip(self.files[old_files:], self.names[old_files:])
-        ):
-            try:
-                with np.load(file) as f:
-                    x = f["x"]
-                    y = f["y"]
-            except ValueError:
-                spectrum = pd.read_csv(
-                    file, delimiter="\t|,", header=None, engine="python"
-                )
-                x, y = [spectrum.iloc[:, col].to_numpy() for col in spectrum]
-                # x, y = np.genfromtxt(file, unpack=True)
-
-            self.spectra = np.append(
-                self.spectra,
-                h2o_processor(
-                    name=name,
-                    x=x,
-                    y=y,
-                    settings=self.settings.loc[name].copy(),
-                    baseline_regions=self.baseline_regions.loc[name].copy(),
-                    interpolation_regions=self.interpolation_regions.loc[name].copy(),
-                ),
-            )
-            if calculate_results:
-                self.spectra[idx].calculate_results()
+        new_spectra = process_map(
+            _read_sample,
+            sources,
+            names,
+            [self.settings.loc[name].copy() for name in names],
+            [self.baseline_regions.loc[name].copy() for name in names],
+            [self.interpolation_regions.loc[name].copy() for name in names],
+            [calculate_results] * len(names),
+            processes=self.processes,
+        )
+        self.registry.extend(new_spectra, names=names, files=files)
+        self.project_changes.update(names)
 
     def add_interference(
         self, file: str, name: Optional[str] = None, settings: Optional[Dict] = None
@@ -167,8 +241,113 @@ class Database_controller:
             current_sample = self.current_sample
             name = current_sample.name
         else:
-            idx = np.where(self.names == name)[0][0]
-            current_sample = self.get_sample(idx)
+            current_sample = self.get_sample_by_name(name)
+
+        x, y = read_spectrum(file)
+        self._set_interference(current_sample, x=x, y=y, settings=settings)
+        self.project_changes.add(name)
+
+    def apply_interference(
+        self,
+        file: str,
+        names: Optional[List[str]] = None,
+        settings: Optional[Dict] = None,
+    ) -> None:
+        """
+        Add one interference spectrum to several samples, all by default.
+
+        The spectrum is read once. Every sample gets its own interference with its
+        own settings, so that they can still be changed per sample. Use
+        :py:meth:`subtract_interferences` to process and subtract them.
+        """
+        if names is None:
+            names = list(self.names)
+        if len(names) < 1:
+            return
+
+        missing = [
+            name
+            for name in names
+            if name not in self.interference_settings["settings"].index
+        ]
+        if missing:
+            if settings:
+                settings = {key: df.loc[missing] for key, df in settings.items()}
+            self.add_interference_settings(names=missing, settings=settings)
+
+        x, y = read_spectrum(file)
+        for name in names:
+            self._set_interference(self.get_sample_by_name(name), x=x, y=y)
+
+        self.project_changes.update(names)
+
+    def subtract_interferences(self, names: Optional[List[str]] = None) -> None:
+        """
+        Subtract interferences from samples, all by default.
+
+        Baselines of interferences are fitted once per distinct spectrum and
+        baseline settings, and interferences that subtract the deconvoluted
+        spectrum are deconvolved once per distinct baseline corrected spectrum and
+        deconvolution settings. All samples with the same interference share the
+        read-only results. Subtractions run on the worker process pool.
+        """
+        if names is None:
+            names = list(self.names)
+        samples = [self.get_sample_by_name(name) for name in names]
+        samples = [s for s in samples if s.interference_sample is not None]
+
+        baselines = {}
+        for sample in samples:
+            interference = sample.interference_sample
+            key = get_key(
+                interference.sample.x,
+                interference.sample.signal.get(interference.sample._spectrumSelect),
+                interference.baseline.interpolation_regions.nested_array,
+                smoothing=interference.baseline.settings.smoothing,
+            )
+            baselines.setdefault(key, []).append(interference)
+
+        for interferences in baselines.values():
+            interferences[0].calculate_baseline()
+            results = interferences[0].baseline.get_results()
+            _set_read_only(results)
+            for interference in interferences:
+                interference.set_baseline_results(results)
+
+        deconvolutions = {}
+        for sample in samples:
+            if sample.interference.settings.spectrum != "deconvoluted":
+                continue
+            interference = sample.interference_sample
+            key = get_key(
+                interference.sample.x,
+                interference.sample.signal.baseline_corrected,
+                **interference.deconvolution.get_settings(),
+            )
+            deconvolutions.setdefault(key, []).append(interference)
+
+        for interferences in deconvolutions.values():
+            results = interferences[0].get_deconvolution_job()()
+            _set_read_only(results)
+            for interference in interferences:
+                interference.set_deconvolution(results)
+
+        jobs = [(sample, sample.get_subtraction_job()) for sample in samples]
+        jobs = [(sample, job) for sample, job in jobs if job is not None]
+        spectra = process_map(
+            _run_job, [job for _, job in jobs], processes=self.processes
+        )
+        for (sample, _), spectrum in zip(jobs, spectra):
+            sample.set_interference_corrected(spectrum)
+
+    def _set_interference(
+        self,
+        sample: h2o_processor,
+        x: npt.NDArray,
+        y: npt.NDArray,
+        settings: Optional[Dict] = None,
+    ):
+        name = sample.name
 
         if self.interference_settings["settings"].shape[0] < 1:
             self.add_interference_settings(names=self.names, settings=settings)
@@ -182,27 +361,20 @@ class Database_controller:
             .copy(),
         )
 
-        try:
-            with np.load(file) as f:
-                x = f["x"]
-                y = f["y"]
-        except ValueError:
-            # x, y = np.genfromtxt(file, unpack=True)
-            spectrum = pd.read_csv(file, delimiter="\t|,", header=None, engine="python")
-            x, y = [spectrum.iloc[:, col].to_numpy() for col in spectrum]
-
-        current_sample.set_interference(
+        # Interference settings are already stored in the database
+        modified = sample.modified
+        sample.set_interference(
             x=x,
             y=y,
             settings=settings,
             baseline_regions=birs,
         )
+        sample.modified = modified
 
     def add_processed_spectra(self, files: List[str], names: List[str]):
         for file, name in zip(files, names):
 
-            idx = np.where(self.names == name)[0][0]
-            sample = self.get_sample(idx)
+            sample = self.get_sample_by_name(name)
 
             with np.load(file, allow_pickle=True) as f:
                 keys = f.keys()
@@ -261,18 +433,11 @@ class Database_controller:
 
     def save_interference(self, idx: Optional[int] = None):
         if idx is None:
-            sample = self.current_sample.interference_sample
+            sample = self.current_sample
         else:
-            sample = self.get_sample(idx).interference_sample
-        name = sample.name
-
-        # save current settings
-        self.interference_settings["settings"].loc[name] = sample.settings.copy()
+            sample = self.get_sample(idx)
 
-        self.interference_settings["baseline_interpolation_regions"] = _insert_row(
-            self.interference_settings["baseline_interpolation_regions"],
-            sample.baseline.interpolation_regions.series,
-        )
+        self._save_interferences([sample])
 
     def save_sample(self, idx=None) -> None:
         """ """
@@ -281,33 +446,119 @@ class Database_controller:
             sample = self.current_sample
         else:
             sample = self.get_sample(idx)
-        name = sample.name
 
-        # save current settings
-        self.settings.loc[name] = sample.settings.copy()
+        self._save_samples([sample])
+        self.update_H2O()
+
+    def save_all_samples(self, modified_only: bool = False) -> None:
+        """
+        Save all samples, or with modified_only only those that have changed since
+        they were last saved.
+        """
+        if not modified_only:
+            # Samples that are not loaded are unchanged since the project was saved
+            samples = [
+                self.registry.get(idx)
+                for idx in range(self.results.shape[0])
+                if self.is_loaded(idx)
+            ]
+        else:
+            samples = [sample for sample in self.spectra if sample.modified]
+
+        self._save_samples(samples)
+        self.update_H2O()
 
-        self.baseline_regions = _insert_row(
-            self.baseline_regions, sample.baseline.interpolation_regions.series
+    def _save_samples(self, samples: List[h2o_processor]) -> None:
+        """
+        Write settings, regions and results of samples to the dataframes, with one
+        write per dataframe.
+        """
+        if len(samples) < 1:
+            return
+        names = [sample.name for sample in samples]
+
+        settings = to_frame([sample.settings_records for sample in samples], names)
+        self.settings = _insert_rows(self.settings, settings)
+
+        self.baseline_regions = _insert_rows(
+            self.baseline_regions,
+            _regions_frame(
+                [s.baseline.interpolation_regions.nested_array for s in samples], names
+            ),
         )
-        self.interpolation_regions = _insert_row(
-            self.interpolation_regions, sample.interpolation.regions.series
+        self.interpolation_regions = _insert_rows(
+            self.interpolation_regions,
+            _regions_frame(
+                [s.interpolation.regions.nested_array for s in samples], names
+            ),
         )
 
-        if sample.interference_sample is not None:
-            self.save_interference(idx=idx)
+        self._save_interferences(
+            [sample for sample in samples if sample.interference_sample is not None]
+        )
 
-        self.results.loc[name] = sample.results.copy()
-        self.results.loc[name, "H2O"] = self.calculate_H2O(sample.results["rWS"])
+        for sample in samples:
+            sample.modified = False
+        self.project_changes.update(names)
+
+        self._write_results(samples)
+
+    def _save_interferences(self, samples: List[h2o_processor]) -> None:
+        """
+        Write interference settings and regions of samples to the dataframes, under
+        the names of the samples
+        """
+        if len(samples) < 1:
+            return
+        names = [sample.name for sample in samples]
+        samples = [sample.interference_sample for sample in samples]
 
-        # Not a great way to save H2O, would be better to do that inside the sample processor
-        self.results.loc[name, "H2O"] = self.calculate_H2O(
-            self.results.loc[name, "rWS"]
+        settings = to_frame([sample.settings_records for sample in samples], names)
+        self.interference_settings["settings"] = _insert_rows(
+            self.interference_settings["settings"], settings
         )
 
-    def save_all_samples(self) -> None:
+        self.interference_settings["baseline_interpolation_regions"] = _insert_rows(
+            self.interference_settings["baseline_interpolation_regions"],
+            _regions_frame(
+                [s.baseline.interpolation_regions.nested_array for s in samples], names
+            ),
+        )
 
-        for sample_idx in range(self.results.shape[0]):
-            self.save_sample(idx=sample_idx)
+    def _write_results(self, samples: List[h2o_processor]) -> None:
+        """
+        Copy results of samples to the results dataframe, without H2O
+        """
+        if len(samples) < 1:
+            return
+        results = pd.DataFrame(
+            [sample.results.to_numpy() for sample in samples],
+            index=[sample.name for sample in samples],
+            columns=samples[0].results.index,
+        ).drop(columns="H2O")
+        self.results = _set_rows(self.results, results)
+
+    def update_H2O(self) -> None:
+        """
+        Recalculate H2O and its 1 sigma uncertainty for all samples with the
+        current calibration
+        """
+        H2O = self.calculate_H2O(
+            self.results["rWS"].to_numpy(dtype=float), uncertainty=True
+        )
+        if H2O is None:
+            H2O = (np.nan, np.nan)
+        self.results["H2O"], self.results["H2O_error"] = H2O
+
+    def get_project_changes(self) -> List[str]:
+        """
+        Names of samples that have changed since the project was last saved
+        """
+        return [
+            sample.name
+            for sample in self.spectra
+            if (sample.name in self.project_changes) or sample.modified
+        ]
 
     def reset_sample(self, tab: str) -> None:
 
@@ -341,13 +592,7 @@ class Database_controller:
 
     def remove_samples(self, index: List[int]) -> None:
 
-        # current_sample = self.files[self.current_sample_index]
-        remove_samples = self.names[index]
-
-        data = [self.spectra, self.files, self.names]
-        for idx in range(len(data)):
-            data[idx] = np.delete(data[idx], index)
-        self.spectra, self.files, self.names = data
+        remove_samples = self.registry.remove(index)
 
         dataframes = [
             self.results,
@@ -358,19 +603,197 @@ class Database_controller:
         for idx in range(len(dataframes)):
             dataframes[idx].drop(labels=remove_samples, axis=0, inplace=True)
 
+        self.project_changes.difference_update(remove_samples)
+
+    def sweep_baseline(
+        self, names: Optional[List[str]] = None, **kwargs
+    ) -> pd.DataFrame:
+        """
+        Baseline sensitivity of samples, all by default, as a table with SiArea,
+        H2Oarea, rWS and H2O per combination of baseline settings. kwargs are
+        passed to :py:meth:`h2o_processor.get_sweep_parameters`.
+        """
+        return self.get_sweep_job(names, **kwargs)()
+
+    def get_sweep_job(
+        self, names: Optional[List[str]] = None, **kwargs
+    ) -> Callable[[], pd.DataFrame]:
+        """
+        :py:meth:`sweep_baseline` as a function that can run on a worker thread,
+        on copies of the samples
+        """
+        if names is None:
+            names = self.names
+        samples = [copy.deepcopy(self.get_sample_by_name(name)) for name in names]
+        parameters = [sample.get_sweep_parameters(**kwargs) for sample in samples]
+
+        return partial(
+            _sweep_baseline,
+            samples,
+            parameters,
+            calculate_H2O=self.calculate_H2O,
+            processes=self.processes,
+        )
+
+    def optimize_birs(self, indices: Optional[List[int]] = None, **kwargs) -> None:
+        """
+        Optimize the baseline interpolation regions of samples, all by default, and
+        recalculate their results. kwargs are passed to
+        :py:meth:`h2o_processor.optimize_birs`.
+        """
+        if indices is None:
+            indices = list(range(len(self.registry)))
+        self.set_samples(indices, self.get_optimize_job(indices, **kwargs)())
+
+    def get_optimize_job(
+        self, indices: List[int], **kwargs
+    ) -> Callable[[], List[h2o_processor]]:
+        """
+        :py:meth:`optimize_birs` as a function that can run on a worker thread, on
+        copies of the loaded samples. Samples that are not loaded are read by the
+        job, opening each project once. Results are applied with
+        :py:meth:`set_samples`
+        """
+        samples = [self.registry.get(i) for i in indices]
+        samples = [
+            sample if isinstance(sample, Lazy_sample) else copy.deepcopy(sample)
+            for sample in samples
+        ]
+
+        return partial(
+            _optimize_samples,
+            samples,
+            read_samples=self._read_project_samples,
+            processes=self.processes,
+            **kwargs,
+        )
+
+    def set_samples(self, indices: List[int], samples: List[h2o_processor]) -> None:
+        """
+        Replace the samples at indices and copy their results
+        """
+        for index, sample in zip(indices, samples):
+            self.registry.set(index, sample)
+
+        self._write_results(samples)
+        self.update_H2O()
+
     def set_project(self, filepath: str):
         self.project = filepath
+        self.project_changes = set()
+        # The project holds all samples after it has been saved or loaded
+        for sample in self.spectra:
+            if isinstance(sample, Lazy_sample):
+                sample.filepath = filepath
 
     @property
     def has_project(self):
         return self.project is not None
 
     def save_results(self):
-        for sample in self.spectra:
-            name = sample.name
-            sample.calculate_results()
-            self.results.loc[name] = sample.results.copy()
-            self.results.loc[name, "H2O"] = self.calculate_H2O(sample.results["rWS"])
+        """
+        Copy results of all loaded samples to the results dataframe and update H2O.
+
+        Only samples with spectra or baseline settings that changed since their
+        last calculation are recalculated. Samples that are not loaded keep the
+        results stored in their project.
+        """
+        indices = [i for i in range(len(self.registry)) if self.is_loaded(i)]
+        outdated = [i for i in indices if self.registry.get(i).results_outdated]
+        samples = process_map(
+            _calculate_sample,
+            [self.registry.get(i) for i in outdated],
+            processes=self.processes,
+        )
+        for index, sample in zip(outdated, samples):
+            self.registry.set(index, sample)
+
+        self._write_results([self.registry.get(i) for i in indices])
+        self.update_H2O()
+
+    def read_project(self, project: Project_file) -> None:
+        """
+        Add all samples from a project.
+
+        Samples with results stored in the project are only loaded once they are
+        needed, other samples are loaded and calculated right away.
+        """
+        settings = project.read_settings()
+        interference_settings = project.read_interference_settings()
+        stored_results = project.read_results()
+
+        names = project.sample_names
+        if stored_results is None:
+            lazy = set()
+        else:
+            stored_results = stored_results.reindex(names)
+            lazy = set(stored_results.index[stored_results["rWS"].notna()])
+
+        self.add_settings_results(names=names, settings=settings)
+        if interference_settings:
+            self.add_interference_settings(names=None, settings=interference_settings)
+
+        placeholders = [
+            Lazy_sample(name, project.filepath, stored_results.loc[name])
+            if name in lazy
+            else None
+            for name in names
+        ]
+        self.registry.extend(
+            placeholders, names=names, files=[spectrum_member(n) for n in names]
+        )
+        if lazy:
+            self.results.loc[list(lazy)] = stored_results.loc[list(lazy)]
+            self.update_H2O()
+
+        self._load_samples(project, [name for name in names if name not in lazy])
+
+    def _load_sample(self, index: int) -> h2o_processor:
+        placeholder = self.registry.get(index)
+        with Project_file(placeholder.filepath) as project:
+            self._load_samples(project, [placeholder.name])
+
+        return self.registry.get(index)
+
+    def _load_samples(self, project: Project_file, names: List[str]) -> None:
+        if len(names) < 1:
+            return
+
+        samples = self._read_project_samples(project, names)
+        for sample in samples:
+            self.registry.set(self.registry.index(sample.name), sample)
+
+        self._write_results(samples)
+        self.update_H2O()
+
+    def _read_project_samples(
+        self, project: Project_file, names: List[str]
+    ) -> List[h2o_processor]:
+        samples = process_map(
+            _read_sample,
+            [project.read_spectrum(name) for name in names],
+            names,
+            [self.settings.loc[name].copy() for name in names],
+            [self.baseline_regions.loc[name].copy() for name in names],
+            [self.interpolation_regions.loc[name].copy() for name in names],
+            [False] * len(names),
+            processes=self.processes,
+        )
+        for sample in samples:
+            if not project.has_processed(sample.name):
+                continue
+            processed = project.read_arrays(processed_member(sample.name))
+            for key, values in processed.items():
+                sample.sample.signal.add(name=key, values=values)
+
+        samples = process_map(_calculate_sample, samples, processes=self.processes)
+
+        for sample in samples:
+            if project.has_interference(sample.name):
+                x, y = read_spectrum(project.open(interference_member(sample.name)))
+                self._set_interference(sample, x=x, y=y)
+
+        return samples
 
     def export_results(
         self, folder: pathlib.Path, name: str, incl_settings: bool = True
@@ -421,11 +844,165 @@ class Database_controller:
         )
         data.to_csv(filepath, index=False)
 
-    def export_all(self, folderpath: pathlib.Path):
-
+    def export_all(self, folderpath: pathlib.Path, threads: Optional[int] = None):
+        """
+        Write the processed spectra of all samples to one csv per sample, on a
+        pool of threads
+        """
         folderpath.mkdir(parents=True, exist_ok=True)
 
+        for samples in self._iter_samples(chunksize=self.export_chunksize):
+            thread_map(
+                self.export_sample,
+                [folderpath / f"{sample.name}.csv" for sample in samples],
+                samples,
+                threads=threads,
+            )
+
+    def export_spectra(
+        self,
+        filepath: pathlib.Path,
+        layout: str = "long",
+        compression: Optional[str] = "zstd",
+    ):
+        """
+        Write the processed spectra of all samples to one Parquet file, or Arrow
+        IPC file for .arrow, .feather and .ipc, in long or wide layout. See
+        :py:mod:`~.spectra_file`.
+        """
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        columns = list(spectrum_columns)
         for sample in self.spectra:
-            name = sample.name
-            filepath = folderpath / f"{name}.csv"
-            self.export_sample(filepath=filepath, sample=sample)
+            if isinstance(sample, Lazy_sample):
+                continue
+            columns.extend(
+                name for name in sample.sample.signal.all if name not in columns
+            )
+
+        with Spectra_writer(
+            filepath,
+            columns=columns,
+            layout=layout,
+            compression=compression,
+            names=self.names,
+        ) as writer:
+            for samples in self._iter_samples(chunksize=self.export_chunksize):
+                writer.write(samples)
+
+    def _iter_samples(self, chunksize: int) -> Iterator[List[h2o_processor]]:
+        """
+        All samples in chunks. Samples that are not loaded are read from their
+        project only for their chunk, so that memory use does not grow with every
+        chunk.
+        """
+        for start in range(0, len(self.registry), chunksize):
+            indices = range(start, min(start + chunksize, len(self.registry)))
+            samples = {i: self.registry.get(i) for i in indices}
+
+            lazy = {}
+            for i, sample in samples.items():
+                if isinstance(sample, Lazy_sample):
+                    lazy.setdefault(sample.filepath, []).append(i)
+            for filepath, lazy_indices in lazy.items():
+                with Project_file(filepath) as project:
+                    loaded = self._read_project_samples(
+                        project, [samples[i].name for i in lazy_indices]
+                    )
+                samples.update(zip(lazy_indices, loaded))
+
+            yield [samples[i] for i in indices]
+
+
+def _read_sample(
+    source,
+    name: str,
+    settings: pd.Series,
+    baseline_regions: pd.Series,
+    interpolation_regions: pd.Series,
+    calculate_results: bool,
+) -> h2o_processor:
+    """
+    Set up a processor for a spectrum file or an (x, y) tuple.
+
+    Module level function so that it can be sent to worker processes
+    """
+    if isinstance(source, tuple):
+        x, y = source
+    else:
+        x, y = read_spectrum(source)
+
+    sample = h2o_processor(
+        name=name,
+        x=x,
+        y=y,
+        settings=settings,
+        baseline_regions=baseline_regions,
+        interpolation_regions=interpolation_regions,
+    )
+    if calculate_results:
+        sample.calculate_results()
+
+    return sample
+
+
+def _sweep_baseline(
+    samples: List[h2o_processor],
+    parameters: List[Tuple[npt.NDArray, npt.NDArray]],
+    calculate_H2O: Callable,
+    processes: Optional[int],
+) -> pd.DataFrame:
+    table = sweep_samples(samples, parameters, processes=processes)
+    H2O = calculate_H2O(table["rWS"].to_numpy(dtype=float))
+    table["H2O"] = np.nan if H2O is None else H2O
+
+    return table
+
+
+def _calculate_sample(sample: h2o_processor) -> h2o_processor:
+    sample.calculate_results()
+    return sample
+
+
+def _run_job(job: Callable):
+    return job()
+
+
+def _set_read_only(results: Dict) -> None:
+    # Results are shared by several samples
+    for value in results.values():
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+
+
+def _optimize_sample(sample: h2o_processor, **kwargs) -> h2o_processor:
+    sample.optimize_birs(**kwargs)
+    sample.calculate_results()
+    return sample
+
+
+def _optimize_samples(
+    samples: List[Sample_proccessor],
+    read_samples: Callable[[Project_file, List[str]], List[h2o_processor]],
+    processes: Optional[int],
+    **kwargs,
+) -> List[h2o_processor]:
+    lazy = {}
+    for i, sample in enumerate(samples):
+        if isinstance(sample, Lazy_sample):
+            lazy.setdefault(sample.filepath, []).append(i)
+    samples = list(samples)
+    for filepath, positions in lazy.items():
+        with Project_file(filepath) as project:
+            loaded = read_samples(project, [samples[i].name for i in positions])
+        for i, sample in zip(positions, loaded):
+            samples[i] = sample
+
+    optimized = []
+    for i, sample in enumerate(
+        process_imap(partial(_optimize_sample, **kwargs), samples, processes=processes)
+    ):
+        optimized.append(sample)
+        print(f"optimizing {i + 1:02d}/{len(samples):02d}")
+
+    return optimized
@@ -0,0 +1,68 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+def get_process_amount(processes: Optional[int] = None) -> int:
+    """
+    Number of worker processes, where 0 or None means one per cpu core
+    """
+    if not processes:
+        processes = os.cpu_count() or 1
+    return max(int(processes), 1)
+
+
+def process_map(
+    func: Callable, *iterables: Iterable, processes: Optional[int] = 1
+) -> List:
+    """
+    Map func over iterables on a pool of worker processes.
+
+    Results are returned in input order. With a single process everything runs
+    serially in the current process, so results are identical in both modes.
+    """
+    arguments = [list(i) for i in iterables]
+    total = min((len(i) for i in arguments), default=0)
+    processes = min(get_process_amount(processes), total)
+
+    if processes <= 1:
+        return list(map(func, *arguments))
+
+    chunksize = max(total // (processes * 4), 1)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(func, *arguments, chunksize=chunksize))
+
+
+def process_imap(
+    func: Callable, *iterables: Iterable, processes: Optional[int] = 1
+) -> Iterator:
+    """
+    Like :py:func:`process_map`, but results are yielded in input order as soon as
+    they are ready, so that callers can report progress.
+    """
+    arguments = [list(i) for i in iterables]
+    total = min((len(i) for i in arguments), default=0)
+    processes = min(get_process_amount(processes), total)
+
+    if processes <= 1:
+        yield from map(func, *arguments)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield from executor.map(func, *arguments)
+
+
+def thread_map(
+    func: Callable, *iterables: Iterable, threads: Optional[int] = None
+) -> List:
+    """
+    Map func over iterables on a pool of threads, for work that mostly waits on
+    files or releases the GIL. Results are returned in input order, None uses the
+    default amount of threads of ThreadPoolExecutor.
+    """
+    arguments = [list(i) for i in iterables]
+    if min((len(i) for i in arguments), default=0) <= 1 or threads == 1:
+        return list(map(func, *arguments))
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(func, *arguments))
@@ -0,0 +1,202 @@
+"""
+Sensitivity of rWS to the baseline: recalculate baselines and areas of a sample
+for many combinations of baseline interpolation regions (BIR) and smoothing.
+
+Parameters are generated around the current regions of a sample, on a grid with
+:py:func:`grid_parameters` or at random with :py:func:`random_parameters`.
+Combinations with overlapping or too narrow regions are left out.
+:py:func:`sweep_baseline` and :py:func:`sweep_samples` calculate them in chunks
+on a pool of worker processes and return a tidy table with one row per
+combination.
+"""
+
+import copy
+from itertools import product
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from .parallel import process_imap
+from .Processors import Interpolation_regions
+
+result_names = ("SiArea", "H2Oarea", "rWS")
+
+
+def grid_parameters(
+    regions: npt.ArrayLike,
+    offsets: Sequence[float],
+    smoothing: Sequence[float],
+    boundaries: Optional[Sequence[int]] = None,
+) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    All combinations of offsets added to the boundaries of regions and smoothing.
+
+    boundaries are indices into the flattened regions, bir_00, bir_01, ...,
+    and default to all boundaries. The amount of combinations grows as
+    len(offsets) ** len(boundaries).
+
+    Returns an (m, n, 2) array of regions and an (m,) array of smoothing
+    """
+    flat = np.asarray(regions, dtype=float).reshape(-1)
+    if boundaries is None:
+        boundaries = range(flat.size)
+    boundaries = list(boundaries)
+
+    shifts = np.array(list(product(offsets, repeat=len(boundaries))), dtype=float)
+    candidates = np.tile(flat, (len(shifts), 1))
+    candidates[:, boundaries] += shifts.reshape(len(shifts), -1)
+
+    smoothing = np.asarray(smoothing, dtype=float)
+    candidates = np.repeat(candidates, len(smoothing), axis=0)
+    smoothing = np.tile(smoothing, len(shifts))
+
+    return _valid_parameters(candidates.reshape(len(candidates), -1, 2), smoothing)
+
+
+def random_parameters(
+    regions: npt.ArrayLike,
+    spread: float,
+    smoothing: Sequence[float],
+    amount: int,
+    boundaries: Optional[Sequence[int]] = None,
+    seed: Optional[int] = None,
+) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    amount combinations of uniformly random offsets within +/- spread added to
+    the boundaries and smoothing values drawn from smoothing.
+
+    Returns an (m, n, 2) array of regions and an (m,) array of smoothing, with m
+    at most amount
+    """
+    rng = np.random.default_rng(seed)
+    flat = np.asarray(regions, dtype=float).reshape(-1)
+    if boundaries is None:
+        boundaries = range(flat.size)
+    boundaries = list(boundaries)
+
+    candidates = np.tile(flat, (amount, 1))
+    candidates[:, boundaries] += rng.uniform(
+        -spread, spread, size=(amount, len(boundaries))
+    )
+    smoothing = rng.choice(np.asarray(smoothing, dtype=float), size=amount)
+
+    return _valid_parameters(candidates.reshape(amount, -1, 2), smoothing)
+
+
+def sweep_baseline(
+    sample,
+    regions: npt.NDArray,
+    smoothing: npt.NDArray,
+    processes: Optional[int] = 1,
+    chunksize: int = 32,
+) -> pd.DataFrame:
+    """
+    SiArea, H2Oarea and rWS of sample for every combination of regions and
+    smoothing, with columns sample, smoothing, bir_00, bir_01, ... and results.
+
+    The sample itself is not changed.
+    """
+    return sweep_samples(
+        [sample], [(regions, smoothing)], processes=processes, chunksize=chunksize
+    )
+
+
+def sweep_samples(
+    samples: List,
+    parameters: List[Tuple[npt.NDArray, npt.NDArray]],
+    processes: Optional[int] = 1,
+    chunksize: int = 32,
+) -> pd.DataFrame:
+    """
+    :py:func:`sweep_baseline` for several samples, each with their own
+    (regions, smoothing). The chunks of all samples share one pool of worker
+    processes, progress is printed per chunk.
+    """
+    chunks = []
+    for sample, (regions, smoothing) in zip(samples, parameters):
+        regions = np.asarray(regions, dtype=float)
+        smoothing = np.asarray(smoothing, dtype=float)
+        for start in range(0, len(regions), chunksize):
+            chunks.append(
+                (
+                    sample,
+                    regions[start : start + chunksize],
+                    smoothing[start : start + chunksize],
+                )
+            )
+
+    results = []
+    for i, chunk_results in enumerate(
+        process_imap(_sweep_chunk, *zip(*chunks), processes=processes)
+    ):
+        results.append(chunk_results)
+        print(f"sweeping {i + 1:02d}/{len(chunks):02d}")
+
+    tables = [
+        _get_table(sample.name, regions, smoothing, chunk_results)
+        for (sample, regions, smoothing), chunk_results in zip(chunks, results)
+    ]
+    if not tables:
+        return pd.DataFrame(columns=["sample", "smoothing", *result_names])
+
+    return pd.concat(tables, ignore_index=True)
+
+
+def sweep_uncertainty(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mean, standard deviation, minimum and maximum of rWS and H2O per sample of
+    a sweep table
+    """
+    columns = [name for name in ("rWS", "H2O") if name in table]
+    return table.groupby("sample", sort=False)[columns].agg(
+        ["mean", "std", "min", "max"]
+    )
+
+
+def _sweep_chunk(
+    sample, regions: npt.NDArray, smoothing: npt.NDArray
+) -> npt.NDArray:
+    """
+    Module level function so that it can be sent to worker processes
+    """
+    sample = copy.deepcopy(sample)
+    baseline = sample.baseline
+
+    results = np.empty((len(regions), len(result_names)))
+    for row, bir, smooth in zip(results, regions, smoothing):
+        baseline.interpolation_regions.set_array(bir)
+        baseline.settings.smoothing = smooth
+        baseline.calculate()
+        sample.sample.calculate_SiH2Oareas()
+        Si, H2O = sample.sample.SiH2Oareas
+        row[:] = Si, H2O, H2O / Si
+
+    return results
+
+
+def _get_table(
+    name: str, regions: npt.NDArray, smoothing: npt.NDArray, results: npt.NDArray
+) -> pd.DataFrame:
+    birs = regions.reshape(len(regions), -1)
+    return pd.DataFrame(
+        {
+            "sample": name,
+            "smoothing": smoothing,
+            **{f"bir_{i:02d}": birs[:, i] for i in range(birs.shape[1])},
+            **{result: results[:, i] for i, result in enumerate(result_names)},
+        }
+    )
+
+
+def _valid_parameters(
+    regions: npt.NDArray, smoothing: npt.NDArray
+) -> Tuple[npt.NDArray, npt.NDArray]:
+    widths = regions[..., 1] - regions[..., 0]
+    gaps = regions[:, 1:, 0] - regions[:, :-1, 1]
+    valid = np.all(widths >= Interpolation_regions.min_width, axis=1) & np.all(
+        gaps >= 0, axis=1
+    )
+
+    return regions[valid], smoothing[valid]
@@ -0,0 +1,358 @@
+import io
+import json
+import os
+import pathlib
+import tarfile
+import tempfile
+import warnings as w
+import zipfile
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import pyarrow as pa
+
+PROJECT_VERSION = 2
+
+settings_names = (
+    "settings",
+    "baseline_interpolation_regions",
+    "interpolation_regions",
+)
+interference_settings_names = ("settings", "baseline_interpolation_regions")
+index_keys = ("samples", "processed", "interference")
+
+
+def spectrum_member(name: str) -> str:
+    return f"data/{name}.npz"
+
+
+def processed_member(name: str) -> str:
+    return f"data/processed/{name}.npz"
+
+
+def interference_member(name: str) -> str:
+    return f"data/interference/{name}.npz"
+
+
+def _is_zip(filepath: pathlib.Path) -> bool:
+    # zipfile.is_zipfile also accepts tar files that end with a zipped .npz member
+    with open(filepath, "rb") as f:
+        return f.read(4) == b"PK\x03\x04"
+
+
+class Project_file:
+    """
+    Random access to the members of a .h2o project file.
+
+    Projects are zip files with uncompressed members and an index.json that lists
+    the samples. Members are read straight from the archive, nothing is extracted
+    to disk. Older, tar based projects are read as well.
+    """
+
+    def __init__(self, filepath: Union[str, pathlib.Path]):
+        self.filepath = pathlib.Path(filepath)
+
+        if _is_zip(self.filepath):
+            self._zip: Optional[zipfile.ZipFile] = zipfile.ZipFile(self.filepath, "r")
+            self._tar: Optional[tarfile.TarFile] = None
+            self._members = {name: name for name in self._zip.namelist()}
+        else:
+            self._zip = None
+            self._tar = tarfile.open(self.filepath, "r")
+            self._members = {
+                os.path.normpath(info.name).replace(os.sep, "/"): info
+                for info in self._tar.getmembers()
+                if info.isfile()
+            }
+
+        self.index = self._read_index()
+        self._indexed = {key: set(self.index[key]) for key in index_keys}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        for archive in (self._zip, self._tar):
+            if archive is not None:
+                archive.close()
+
+    @property
+    def is_legacy(self) -> bool:
+        return self._zip is None
+
+    @property
+    def sample_names(self) -> List[str]:
+        return self.index["samples"]
+
+    @property
+    def processed_names(self) -> List[str]:
+        return self.index["processed"]
+
+    @property
+    def interference_names(self) -> List[str]:
+        return self.index["interference"]
+
+    def has_processed(self, name: str) -> bool:
+        return name in self._indexed["processed"]
+
+    def has_interference(self, name: str) -> bool:
+        return name in self._indexed["interference"]
+
+    def __contains__(self, member: str) -> bool:
+        return member in self._members
+
+    def read(self, member: str) -> bytes:
+        if self._zip is not None:
+            return self._zip.read(member)
+        return self._tar.extractfile(self._members[member]).read()
+
+    def open(self, member: str) -> io.BytesIO:
+        return io.BytesIO(self.read(member))
+
+    def read_json(self, member: str) -> Dict:
+        return json.loads(self.read(member))
+
+    def read_parquet(self, member: str) -> pd.DataFrame:
+        return pd.read_parquet(self.open(member)).sort_index()
+
+    def read_arrays(self, member: str) -> Dict[str, npt.NDArray]:
+        with np.load(self.open(member), allow_pickle=True) as f:
+            return {key: f[key] for key in f.keys()}
+
+    def read_spectrum(self, name: str) -> Tuple[npt.NDArray, npt.NDArray]:
+        arrays = self.read_arrays(spectrum_member(name))
+        return arrays["x"], arrays["y"]
+
+    def read_settings(self) -> Dict[str, pd.DataFrame]:
+        settings = {}
+        for name in settings_names:
+            member = f"{name}.parquet"
+            if member not in self:
+                continue
+            try:
+                settings[name] = self.read_parquet(member)
+            except pa.ArrowInvalid:
+                # Some old projects stored csv data
+                settings[name] = pd.read_csv(
+                    self.open(member), index_col=[0], header=[0, 1]
+                )
+        return settings
+
+    def read_results(self) -> Optional[pd.DataFrame]:
+        """
+        Results stored at the last save, None for older projects
+        """
+        if "results.parquet" not in self:
+            return None
+        return self.read_parquet("results.parquet")
+
+    def read_interference_settings(self) -> Dict[str, pd.DataFrame]:
+        return {
+            name: self.read_parquet(f"data/interference/{name}.parquet")
+            for name in interference_settings_names
+            if f"data/interference/{name}.parquet" in self
+        }
+
+    @property
+    def unused_size(self) -> int:
+        """
+        Size in bytes of members that were replaced or removed by appending saves
+        """
+        if self._zip is None:
+            return 0
+
+        indexed = {
+            *(spectrum_member(name) for name in self.sample_names),
+            *(processed_member(name) for name in self.processed_names),
+            *(interference_member(name) for name in self.interference_names),
+        }
+        used_size = sum(
+            self._zip.getinfo(member).compress_size
+            for member in self._members
+            if member in indexed or not member.endswith(".npz")
+        )
+        total_size = sum(info.compress_size for info in self._zip.infolist())
+
+        return total_size - used_size
+
+    @property
+    def size(self) -> int:
+        return self.filepath.stat().st_size
+
+    def _read_index(self) -> Dict:
+        if "index.json" in self:
+            return self.read_json("index.json")
+
+        # Older projects have no index, collect samples from the file names
+        index = {"version": 1}
+        for key, folder in (
+            ("samples", "data"),
+            ("processed", "data/processed"),
+            ("interference", "data/interference"),
+        ):
+            index[key] = sorted(
+                pathlib.PurePosixPath(member).stem
+                for member in self._members
+                if member.endswith(".npz")
+                and str(pathlib.PurePosixPath(member).parent) == folder
+            )
+        return index
+
+
+class Project_writer:
+    """
+    Write a .h2o project file.
+
+    Members are stored uncompressed so that they can be read without extracting
+    the whole project. The project is written to a temporary file that replaces
+    filepath when the writer is closed.
+
+    With append, members are added to an existing project instead. Members that
+    are written again replace the older copies, which stay in the file as unused
+    data until the project is written in full.
+    """
+
+    def __init__(self, filepath: Union[str, pathlib.Path], append: bool = False):
+        self.filepath = pathlib.Path(filepath)
+        self.append = append
+
+        if append:
+            with Project_file(self.filepath) as project:
+                self.index = project.index
+            self._indexed = {key: set(self.index[key]) for key in index_keys}
+            self._temp_path = None
+            self._zip = zipfile.ZipFile(self.filepath, "a", zipfile.ZIP_STORED)
+            return
+
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        handle, self._temp_path = tempfile.mkstemp(
+            suffix=".tmp", dir=self.filepath.parent
+        )
+        os.close(handle)
+        self._zip = zipfile.ZipFile(self._temp_path, "w", zipfile.ZIP_STORED)
+
+        self.index = {
+            "version": PROJECT_VERSION,
+            "samples": [],
+            "processed": [],
+            "interference": [],
+        }
+        self._indexed = {key: set() for key in index_keys}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is not None:
+            # Keep the old index, so that the project does not refer to partly
+            # written samples
+            self._zip.close()
+            if self._temp_path is not None:
+                os.unlink(self._temp_path)
+            return
+        self.close()
+
+    def close(self) -> None:
+        self.write_json("index.json", self.index)
+        self._zip.close()
+        if self._temp_path is not None:
+            os.replace(self._temp_path, self.filepath)
+
+    def write(self, member: str, data: bytes) -> None:
+        with w.catch_warnings():
+            # Replacing members is intended when appending
+            w.filterwarnings("ignore", message="Duplicate name")
+            self._zip.writestr(member, data)
+
+    def set_samples(self, names: List[str]) -> None:
+        """
+        Set the samples in the project, processed and interference spectra of
+        samples that are not in names are dropped.
+        """
+        self.index["samples"] = list(names)
+        self._indexed["samples"] = set(names)
+        for key in ("processed", "interference"):
+            self._indexed[key] &= self._indexed["samples"]
+            self.index[key] = [
+                name for name in self.index[key] if name in self._indexed[key]
+            ]
+
+    def _add_to_index(self, key: str, name: str) -> None:
+        if name in self._indexed[key]:
+            return
+        self._indexed[key].add(name)
+        self.index[key].append(name)
+
+    def _remove_from_index(self, key: str, name: str) -> None:
+        if name not in self._indexed[key]:
+            return
+        self._indexed[key].remove(name)
+        self.index[key].remove(name)
+
+    def remove_processed(self, name: str) -> None:
+        self._remove_from_index("processed", name)
+
+    def remove_interference(self, name: str) -> None:
+        self._remove_from_index("interference", name)
+
+    def write_json(self, member: str, data: Dict) -> None:
+        self.write(member, json.dumps(data, ensure_ascii=False, indent=4).encode())
+
+    def write_parquet(self, member: str, data: pd.DataFrame) -> None:
+        buffer = io.BytesIO()
+        data.to_parquet(buffer)
+        self.write(member, buffer.getvalue())
+
+    def write_arrays(self, member: str, **arrays: npt.NDArray) -> None:
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        self.write(member, buffer.getvalue())
+
+    def write_spectrum(self, name: str, x: npt.NDArray, y: npt.NDArray) -> None:
+        self.write_arrays(spectrum_member(name), x=x, y=y)
+        self._add_to_index("samples", name)
+
+    def write_processed(self, name: str, **spectra: npt.NDArray) -> None:
+        self.write_arrays(processed_member(name), **spectra)
+        self._add_to_index("processed", name)
+
+    def write_interference(self, name: str, x: npt.NDArray, y: npt.NDArray) -> None:
+        self.write_arrays(interference_member(name), x=x, y=y)
+        self._add_to_index("interference", name)
+
+    def copy_sample(self, project: Project_file, name: str) -> None:
+        """
+        Copy all spectra of a sample from another project without decoding them
+        """
+        self.write(spectrum_member(name), project.read(spectrum_member(name)))
+        self._add_to_index("samples", name)
+
+        if project.has_processed(name):
+            self.write(processed_member(name), project.read(processed_member(name)))
+            self._add_to_index("processed", name)
+        else:
+            self.remove_processed(name)
+
+        if project.has_interference(name):
+            member = interference_member(name)
+            self.write(member, project.read(member))
+            self._add_to_index("interference", name)
+        else:
+            self.remove_interference(name)
+
+    def write_results(self, results: pd.DataFrame) -> None:
+        self.write_parquet("results.parquet", results)
+
+    def write_settings(self, settings: Dict[str, pd.DataFrame]) -> None:
+        for name, data in settings.items():
+            self.write_parquet(f"{name}.parquet", data)
+
+    def write_interference_settings(self, settings: Dict[str, pd.DataFrame]) -> None:
+        for name, data in settings.items():
+            self.write_parquet(f"data/interference/{name}.parquet", data)
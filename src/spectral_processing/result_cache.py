@@ -0,0 +1,139 @@
+import hashlib
+import weakref
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from .. import app_configuration
+
+
+def get_key(*arrays: npt.NDArray, **values: Any) -> bytes:
+    """
+    Hash the contents of arrays and values into a cache key
+    """
+    key = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        key.update(str((array.dtype, array.shape)).encode())
+        key.update(array.tobytes())
+    key.update(repr(sorted(values.items())).encode())
+
+    return key.digest()
+
+
+# Keys of read-only arrays by id, with a weak reference to check identity
+_array_keys: Dict[int, Tuple[weakref.ref, bytes]] = {}
+
+
+def get_array_key(array: npt.NDArray) -> bytes:
+    """
+    get_key of one array. Keys of read-only arrays that own their data are
+    remembered for as long as the array exists, so shared arrays are hashed once.
+    """
+    if array.flags.writeable or not array.flags.owndata:
+        return get_key(array)
+
+    entry = _array_keys.get(id(array))
+    if entry is not None and entry[0]() is array:
+        return entry[1]
+
+    key = get_key(array)
+    remove = partial(_array_keys.pop, id(array), None)
+    _array_keys[id(array)] = (weakref.ref(array, lambda _: remove()), key)
+
+    return key
+
+
+class Result_cache:
+    """
+    Least recently used cache for calculation results.
+
+    The total size of the arrays in the cached results is kept below max_size
+    (bytes) by evicting the least recently used results first. Without max_size,
+    result_cache_size (MB) from the general settings is used.
+    """
+
+    # Rough size of the dictionary, key and scalars of one cached result
+    entry_overhead = 512
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._max_size = max_size
+
+        self._results: OrderedDict[bytes, Dict[str, Any]] = OrderedDict()
+        self._sizes: Dict[bytes, int] = {}
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is not None:
+            return self._max_size
+        return int(app_configuration.general.get("result_cache_size", 64) * 1e6)
+
+    @max_size.setter
+    def max_size(self, value: Optional[int]) -> None:
+        self._max_size = value
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._results
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        result = self._results.get(key, None)
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._results.move_to_end(key)
+
+        return result
+
+    def add(self, key: bytes, result: Dict[str, Any]) -> None:
+        size = self.entry_overhead + sum(
+            value.nbytes for value in result.values() if isinstance(value, np.ndarray)
+        )
+        max_size = self.max_size
+        if size > max_size:
+            return
+
+        if key in self._results:
+            self._remove(key)
+
+        self._results[key] = result
+        self._sizes[key] = size
+        self.size += size
+
+        while self.size > max_size:
+            self._remove(next(iter(self._results)))
+
+    def _remove(self, key: bytes) -> None:
+        del self._results[key]
+        self.size -= self._sizes.pop(key)
+
+    def clear(self) -> None:
+        self._results.clear()
+        self._sizes.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "results": len(self),
+            "size": self.size,
+            "max_size": self.max_size,
+        }
+
+
+result_cache = Result_cache()
@@ -0,0 +1,70 @@
+import os
+from typing import List, Optional
+
+from .. import app_configuration
+
+
+def get_names_from_files(
+    files: List, previous_names: List[str] = [], delimiter: Optional[str] = None
+) -> List:
+    if delimiter is None:
+        delimiter = app_configuration.general["name_separator"]
+    names = []
+
+    for file in files:
+        try:
+            name = os.path.basename(file)
+        except TypeError:
+            name = file.name
+        if delimiter not in name:
+            names.append(name)
+        else:
+            names.append(name[: name.index(delimiter)])
+
+    names = remove_duplicate_names(names, previous_names=previous_names)
+
+    return names
+
+
+def remove_duplicate_names(
+    names: List[str], previous_names: List[str] = []
+) -> List[str]:
+    new_names = names.copy()
+    last_maximum = {}
+    # Get the maxium suffix valeu for each sample in the current dataset
+    if len(previous_names) > 0:
+        previous_samples = [
+            name[: name.index("@")] if "@" in name else name for name in previous_names
+        ]
+
+        for sample in set(previous_samples):
+            if previous_samples.count(sample) < 2:
+                continue
+            previous_suffix = max(
+                [
+                    int(name[name.index("@") + 1 :])
+                    for name in previous_names
+                    if f"{sample}@" in name
+                ]
+            )
+            last_maximum[sample] = previous_suffix
+    else:
+        previous_samples = []
+
+    # Add a suffix the each name spectrum, start counting from the last maximum suffix value
+    for i, _ in enumerate(new_names):
+        current_name = new_names[i]
+
+        new_occurences = (new_names).count(current_name)
+        previous_occurences = previous_samples.count(current_name)
+
+        if (new_occurences <= 1) & (previous_occurences == 0):
+            continue
+        try:
+            last_suffix = last_maximum[current_name]
+        except KeyError:
+            last_suffix = 0
+
+        new_names[i] = f"{current_name}@{last_suffix + new_occurences}"
+
+    return new_names
@@ -1,4 +1,5 @@
-from typing import Any, Dict, List, Optional, Protocol, Tuple
+import pathlib
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
 
 import blinker as bl
 import numpy as np
@@ -6,12 +7,18 @@ import numpy.typing as npt
 import pandas as pd
 import ramCOH as ram
 
+from ..profiling import profiled
 from .Processors import (
     Baseline_processor,
     Deconvolution_processor,
     Interference_processor,
     Interpolation_processor,
+    Settings_record,
+    to_series,
 )
+from .bir_optimizer import optimize_regions
+from .parameter_sweep import grid_parameters, random_parameters, sweep_baseline
+from .result_cache import get_key, result_cache
 
 on_display_message = bl.signal("display message")
 
@@ -50,55 +57,101 @@ class Raman_processor:
         self.deconvolution = Deconvolution_processor(
             sample=self.sample, settings=settings.loc["deconvolution"]
         )
+        # x-axes are shared and hashed as cache keys, they never change in place
+        self.sample.x.flags.writeable = False
+
+        self._modified = False
 
     @property
-    def settings(self) -> pd.Series:
-        settings = {
+    def settings_records(self) -> Dict[str, Settings_record]:
+        """
+        Settings records per group of the settings dataframes
+        """
+        return {
             "baseline": self.baseline.settings,
             "deconvolution": self.deconvolution.settings,
         }
-        return pd.concat(settings, axis=0)
+
+    @property
+    def settings(self) -> pd.Series:
+        """
+        Settings as a row of the settings dataframes
+        """
+        return to_series(self.settings_records)
+
+    @property
+    def modified(self) -> bool:
+        """
+        True if settings or spectra have changed since the sample was last saved
+        """
+        return self._modified
+
+    @modified.setter
+    def modified(self, value: bool) -> None:
+        self._modified = value
 
     def apply_settings(self, settings: pd.Series, groups: List[str]):
+        self._modified = True
         for group in groups:
             processor = getattr(self, group)
-            setattr(processor, "settings", settings.loc[group].copy())
+            processor.settings = type(processor.settings).from_series(
+                settings.loc[group]
+            )
 
     def get_birs(self) -> Dict[str, int]:
         return self.baseline.interpolation_regions.dictionary
 
     def set_baseline(self, kwargs) -> None:
+        self._modified = True
         self.baseline.apply_settings(kwargs)
 
     def get_baseline_settings(self) -> Dict:
         return self.baseline.get_settings()
 
     def add_bir(self, index: int):
+        self._modified = True
         self.baseline.interpolation_regions.add(index=index)
 
     def remove_bir(self, index: int):
+        self._modified = True
         self.baseline.interpolation_regions.remove(index=index)
 
+    @profiled
     def calculate_baseline(self):
         self.baseline.calculate()
 
+    def set_baseline_results(self, results: Dict) -> None:
+        self.baseline.set_results(results)
+
+    @profiled
     def deconvolve(self):
+        self._modified = True
         self.deconvolution.calculate()
 
+    def get_deconvolution_job(self) -> Callable[[], Dict]:
+        return self.deconvolution.get_job()
+
+    def set_deconvolution(self, results: Dict) -> None:
+        self._modified = True
+        self.deconvolution.set_results(results)
+
     def get_deconvolution_settings(self) -> Dict:
         return self.deconvolution.settings
 
     def set_deconvolution_settings(self, kwargs):
+        self._modified = True
         self.deconvolution.apply_settings(kwargs)
 
+    @profiled
     def calculate_noise(self):
         self.sample.calculate_noise()
 
     def _set_parameters(self, group: str, parameters: Dict, names: List[str]) -> None:
+        settings = getattr(self, group).settings
         for name in names:
             value = parameters.pop(name, None)
             if value is not None:
-                self.settings[(group, name)] = value
+                settings[name] = value
 
     def get_plot_spectra(self) -> Dict:
         spectra = self.sample.signal.all
@@ -107,6 +160,7 @@ class Raman_processor:
             **spectra,
         }
 
+    @profiled
     def get_plotdata(self) -> Dict[str, Any]:
         """
         Returns
@@ -133,6 +187,7 @@ class Raman_processor:
 
 
 class h2o_processor(Raman_processor):
+    @profiled
     def __init__(
         self,
         name: str,
@@ -179,21 +234,51 @@ class h2o_processor(Raman_processor):
         )
 
         self._interference_sample: Optional[Raman_processor] = None
+        # Key of the spectrum and settings used for the current results
+        self._results_key: Optional[bytes] = None
 
         self.set_spectrum_processing()
 
+        self._modified = False
+
     # @property
     # def H2Oreference(self):
     #     return self._H2Oreference
 
     @property
-    def settings(self):
-        settings = {
+    def settings_records(self) -> Dict[str, Settings_record]:
+        """
+        Settings records per group of the settings dataframes
+        """
+        return {
             "baseline": self.baseline.settings,
             "interpolation": self.interpolation.settings,
             "interference": self.interference.settings,
         }
-        return pd.concat(settings, axis=0)
+
+    @property
+    @profiled
+    def settings(self) -> pd.Series:
+        """
+        Settings as a row of the settings dataframes
+        """
+        return to_series(self.settings_records)
+
+    @property
+    def modified(self) -> bool:
+        """
+        True if settings or spectra, including those of the interference, have
+        changed since the sample was last saved
+        """
+        if self._interference_sample is not None:
+            return self._modified or self._interference_sample.modified
+        return self._modified
+
+    @modified.setter
+    def modified(self, value: bool) -> None:
+        self._modified = value
+        if self._interference_sample is not None:
+            self._interference_sample.modified = value
 
     @property
     def interference_sample(self):
@@ -201,16 +286,15 @@ class h2o_processor(Raman_processor):
 
     @property
     def interpolation_spectrum(self) -> str:
-        return ["raw", "interference_corrected"][self.settings[("interference", "use")]]
+        return ["raw", "interference_corrected"][bool(self.interference.settings.use)]
 
     def set_spectrum_processing(
         self, types: Optional[str] = None, values: Optional[bool] = None
     ) -> None:
+        self._modified = True
         if types is None:
             types = ["interpolated", "interference_corrected"]
-            values = self.settings.loc[
-                ["interpolation", "interference"], ["use", "use"]
-            ].values
+            values = [self.interpolation.settings.use, self.interference.settings.use]
 
         self.sample._set_processing(types=types, values=values)
 
@@ -220,7 +304,7 @@ class h2o_processor(Raman_processor):
                 "interference_corrected": "interference",
             }[t]
             processor = getattr(self, name)
-            processor.settings["use"] = bool(val)  # Make sure it is not numpy.bool_
+            processor.settings.use = bool(val)  # Make sure it is not numpy.bool_
 
         if len(values) > 1:
             return
@@ -231,12 +315,15 @@ class h2o_processor(Raman_processor):
             self.calculate_interpolation(interference=False)
 
     def add_interpolation_region(self, index: int):
+        self._modified = True
         self.interpolation.regions.add(index=index)
 
     def remove_interpolation_region(self, index):
+        self._modified = True
         self.interpolation.regions.remove(index=index)
 
     def set_interference(self, x, y, settings, baseline_regions):
+        self._modified = True
         self._interference_sample = Raman_processor(
             self.name,
             x,
@@ -248,9 +335,10 @@ class h2o_processor(Raman_processor):
     def remove_interference(self):
         if self._interference_sample is None:
             return
+        self._modified = True
         self._interference_sample = None
         self.sample.signal.remove(["interference_corrected"])
-        self.settings[("interference", "use")] = False
+        self.interference.settings.use = False
 
     def get_interference_settings(self) -> Tuple[Dict, Dict]:
         subtraction_settings = self.get_subtraction_parameters()
@@ -263,6 +351,7 @@ class h2o_processor(Raman_processor):
             "subtraction": subtraction_settings,
         }
 
+    @profiled
     def calculate_noise(self):
         super().calculate_noise()
         self.sample.calculate_SNR()
@@ -271,19 +360,141 @@ class h2o_processor(Raman_processor):
             for i in (self.sample.noise, self.sample.Si_SNR, self.sample.H2O_SNR)
         ]
 
+    @profiled
     def calculate_areas(self):
         self.sample.calculate_SiH2Oareas()
         self.results[["SiArea", "H2Oarea"]] = self.sample.SiH2Oareas
         self.results["rWS"] = self.results["H2Oarea"] / self.results["SiArea"]
 
+    @profiled
     def calculate_results(self):
+        """
+        Calculate baseline, noise and areas, or reuse earlier results if the
+        spectrum and baseline settings have not changed.
+        """
+        key = self._get_results_key()
+        self._results_key = key
+        cached = result_cache.get(key)
+        if cached is not None:
+            self._set_results(cached)
+            return
+
         self.calculate_baseline()
         self.calculate_noise()
         self.calculate_areas()
 
+        result_cache.add(key, self._get_results())
+
+    @property
+    def results_outdated(self) -> bool:
+        """
+        True if the spectrum or baseline settings have changed since results were
+        last calculated
+        """
+        return self._results_key != self._get_results_key()
+
+    def _get_results_key(self) -> bytes:
+        # The selected spectrum already includes interpolation and interference
+        # subtraction
+        return get_key(
+            self.sample.x,
+            getattr(self.sample.signal, self.sample._spectrumSelect),
+            np.asarray(self.baseline.interpolation_regions.nested_array, dtype=float),
+            smoothing=float(self.baseline.settings.smoothing),
+        )
+
+    def _get_results(self) -> Dict[str, Any]:
+        results = {
+            "birs": np.array(self.sample.birs, dtype=float),
+            "baseline": self.sample.signal.get("baseline"),
+            "baseline_corrected": self.sample.signal.get("baseline_corrected"),
+            "noise": self.sample.noise,
+            "Si_SNR": self.sample.Si_SNR,
+            "H2O_SNR": self.sample.H2O_SNR,
+            "SiH2Oareas": self.sample.SiH2Oareas,
+            "results": self.results.to_numpy(copy=True),
+        }
+        for value in results.values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+        return results
+
+    def _set_results(self, results: Dict[str, Any]) -> None:
+        self.sample.birs = results["birs"]
+        self.sample.baseline = results["baseline"]
+        for name in ("baseline_corrected", "baseline"):
+            self.sample.signal.add(name, results[name])
+        for name in ("noise", "Si_SNR", "H2O_SNR", "SiH2Oareas"):
+            setattr(self.sample, name, results[name])
+        self.results[:] = results["results"]
+
+    def get_sweep_parameters(
+        self,
+        smoothing: Optional[List[float]] = None,
+        offsets: Optional[List[float]] = None,
+        spread: Optional[float] = None,
+        amount: int = 500,
+        boundaries: Optional[List[int]] = None,
+        seed: Optional[int] = None,
+    ) -> Tuple[npt.NDArray, npt.NDArray]:
+        """
+        Combinations of baseline interpolation regions and smoothing around the
+        current settings, see :py:mod:`~.parameter_sweep`.
+
+        With offsets all combinations of offsets added to the boundaries are
+        returned, with spread amount combinations of random offsets within
+        +/- spread. smoothing defaults to the current smoothing.
+        """
+        regions = self.baseline.interpolation_regions.nested_array
+        if smoothing is None:
+            smoothing = [self.baseline.settings.smoothing]
+
+        if offsets is not None:
+            return grid_parameters(
+                regions, offsets=offsets, smoothing=smoothing, boundaries=boundaries
+            )
+        if spread is not None:
+            return random_parameters(
+                regions,
+                spread=spread,
+                smoothing=smoothing,
+                amount=amount,
+                boundaries=boundaries,
+                seed=seed,
+            )
+        raise ValueError("set offsets or spread")
+
+    def sweep_baseline(self, processes: Optional[int] = 1, **kwargs) -> pd.DataFrame:
+        """
+        SiArea, H2Oarea and rWS for combinations of baseline settings from
+        :py:meth:`get_sweep_parameters`, one row per combination
+        """
+        return sweep_baseline(
+            self, *self.get_sweep_parameters(**kwargs), processes=processes
+        )
+
+    def optimize_birs(self, **kwargs) -> npt.NDArray:
+        """
+        Move the baseline interpolation regions to where the spectrum is lowest
+        and flattest, kwargs are passed to
+        :py:func:`~.bir_optimizer.optimize_regions`. Results need to be
+        recalculated afterwards.
+        """
+        regions = optimize_regions(
+            self.sample.x,
+            getattr(self.sample.signal, self.sample._spectrumSelect),
+            self.baseline.interpolation_regions.nested_array,
+            **kwargs,
+        )
+        self._modified = True
+        self.baseline.interpolation_regions.set_array(regions)
+
+        return regions
+
     def get_interpolation_regions(self) -> Dict[str, int]:
         return self.interpolation.regions.dictionary
 
+    @profiled
     def calculate_interpolation(
         self, interference: bool
     ) -> Tuple[npt.NDArray, npt.NDArray]:
@@ -292,7 +503,7 @@ class h2o_processor(Raman_processor):
             kwargs["spectrum"] = "raw"
             kwargs["add_noise"] = False
             kwargs["regions"] = [self.interference.minimisation_region]
-            kwargs["smoothing"] = self.interference.settings["smoothing"]
+            kwargs["smoothing"] = self.interference.settings.smoothing
 
         return self.interpolation.calculate(**kwargs)
 
@@ -300,16 +511,31 @@ class h2o_processor(Raman_processor):
         return self.interpolation.get_settings()
 
     def set_interpolation(self, kwargs: Dict) -> None:
+        self._modified = True
         self.interpolation.apply_settings(kwargs)
 
     def set_subtraction_parameters(self, kwargs: Dict) -> None:
+        self._modified = True
         self.interference.apply_settings(**kwargs)
 
     def get_subtraction_parameters(self) -> Dict:
         return self.interference.get_settings()
 
+    @profiled
     def subtract_interference(self) -> bool:
-        return self.interference.calculate(interference=self.interference_sample.sample)
+        self._modified = True
+        return self.interference.calculate(
+            interference=self.interference_sample.sample
+        )
+
+    def get_subtraction_job(self) -> Optional[Callable[[], npt.NDArray]]:
+        return self.interference.get_job(
+            interference=self.interference_sample.sample
+        )
+
+    def set_interference_corrected(self, spectrum: npt.NDArray) -> None:
+        self._modified = True
+        self.interference.set_results(spectrum)
 
     def get_plot_spectra(self) -> Dict:
         spectra = super().get_plot_spectra()
@@ -318,6 +544,7 @@ class h2o_processor(Raman_processor):
             **spectra,
         }
 
+    @profiled
     def get_plotdata(self) -> Dict[str, Any]:
         plotdata = super().get_plotdata()
         plotdata["subtraction_region"] = self.interference.minimisation_region
@@ -330,3 +557,20 @@ class h2o_processor(Raman_processor):
             plotdata["interference"] = self.interference_sample.get_plotdata()
 
         return plotdata
+
+
+class Lazy_sample:
+    """
+    Stand-in for a sample in a project file that has not been loaded yet.
+
+    Only keeps the project file and the results stored in it, the spectra are
+    read when the sample is needed.
+    """
+
+    modified = False
+    interference_sample = None
+
+    def __init__(self, name: str, filepath: pathlib.Path, results: pd.Series):
+        self.name = name
+        self.filepath = filepath
+        self.results = results
@@ -0,0 +1,114 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+
+class Sample_registry:
+    """
+    Ordered storage of sample processors, their names and source files.
+
+    Samples are kept in lists, so appending is amortized O(1), and names are
+    indexed for constant time lookups. The numpy views returned by
+    :py:attr:`spectra`, :py:attr:`names` and :py:attr:`files` are cached until
+    the registry changes.
+    """
+
+    def __init__(self):
+        self._spectra: List[Any] = []
+        self._names: List[str] = []
+        self._files: List[Any] = []
+        self._index: Dict[str, int] = {}
+
+        self._views: Dict[str, npt.NDArray] = {}
+
+    def __len__(self) -> int:
+        return len(self._spectra)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    @property
+    def spectra(self) -> npt.NDArray:
+        return self._get_view("spectra", dtype=object)
+
+    @property
+    def names(self) -> npt.NDArray:
+        return self._get_view("names", dtype=str)
+
+    @property
+    def files(self) -> npt.NDArray:
+        return self._get_view("files", dtype=str)
+
+    def _get_view(self, name: str, dtype) -> npt.NDArray:
+        view = self._views.get(name, None)
+        if view is not None:
+            return view
+
+        data = getattr(self, f"_{name}")
+        if dtype is object:
+            # Prevent numpy from unpacking elements
+            view = np.empty(len(data), dtype=object)
+            view[:] = data
+        else:
+            view = np.array(data, dtype=dtype)
+        view.flags.writeable = False
+        self._views[name] = view
+
+        return view
+
+    def index(self, name: str) -> int:
+        return self._index[name]
+
+    def get(self, index: int) -> Any:
+        return self._spectra[index]
+
+    def get_by_name(self, name: str) -> Any:
+        return self._spectra[self._index[name]]
+
+    def extend(
+        self, spectra: Iterable[Any], names: Iterable[str], files: Iterable[Any]
+    ) -> None:
+        for sample, name, file in zip(spectra, names, files):
+            self._index[name] = len(self._spectra)
+            self._spectra.append(sample)
+            self._names.append(name)
+            self._files.append(file)
+        self._views.clear()
+
+    def set(self, index: int, sample: Any) -> None:
+        self._spectra[index] = sample
+        self._views.pop("spectra", None)
+
+    def remove(self, index: Optional[Iterable[int]]) -> List[str]:
+        """
+        Remove samples at positions index in a single pass.
+
+        Only entries after the first removed position are moved and re-indexed, so
+        removing samples near the end is cheap. Positions are list indices, which
+        means removal from the front still costs O(n).
+
+        Returns
+        -------
+        list of str
+            names of the removed samples
+        """
+        remove = sorted(set(np.atleast_1d(index).tolist()))
+        if not remove:
+            return []
+        removed_names = [self._names[i] for i in remove]
+
+        first = remove[0]
+        removed = set(remove)
+        keep = [i for i in range(first, len(self._spectra)) if i not in removed]
+        for name in ("_spectra", "_names", "_files"):
+            data = getattr(self, name)
+            data[first:] = [data[i] for i in keep]
+
+        for name in removed_names:
+            del self._index[name]
+        for i in range(first, len(self._names)):
+            self._index[self._names[i]] = i
+        self._views.clear()
+
+        return removed_names
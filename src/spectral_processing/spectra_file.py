@@ -0,0 +1,146 @@
+"""
+Processed spectra of many samples in one Parquet or Arrow IPC file.
+
+In the long layout every row is one point of one sample, with columns sample, x
+and one column per spectrum. In the wide layout every row is one sample, with the
+arrays in list columns. Spectra that a sample does not have are null.
+
+Arrow IPC files (.arrow, .feather) written with compression=None can be memory
+mapped without copying, e.g. with ``pyarrow.ipc.open_file(pyarrow.memory_map(f))``.
+"""
+
+import pathlib
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+spectrum_columns = (
+    "raw",
+    "interference_corrected",
+    "interpolated",
+    "baseline",
+    "baseline_corrected",
+)
+layouts = ("long", "wide")
+ipc_suffixes = (".arrow", ".feather", ".ipc")
+
+
+def get_schema(columns: Sequence[str], layout: str) -> pa.Schema:
+    if layout not in layouts:
+        raise ValueError(f"layout should be one of {layouts}")
+
+    value_type = pa.float64() if layout == "long" else pa.large_list(pa.float64())
+    return pa.schema(
+        [pa.field("sample", pa.dictionary(pa.int32(), pa.string()))]
+        + [pa.field(name, value_type) for name in ("x", *columns)]
+    )
+
+
+def spectra_table(
+    samples: List,
+    columns: Sequence[str],
+    layout: str,
+    names: Optional[Sequence[str]] = None,
+) -> pa.Table:
+    """
+    Table with the processed spectra of samples, spectra not in columns are left
+    out. names is the dictionary of the sample column and defaults to the names
+    of samples.
+    """
+    schema = get_schema(columns, layout)
+    if names is None:
+        names = [sample.name for sample in samples]
+    positions = {name: i for i, name in enumerate(names)}
+    indices = np.array([positions[sample.name] for sample in samples], dtype=np.int32)
+    dictionary = pa.array(names, pa.string())
+
+    signals = [sample.sample.signal for sample in samples]
+    lengths = np.array([len(signal.x) for signal in signals], dtype=np.int64)
+
+    if layout == "long":
+        sample_column = pa.DictionaryArray.from_arrays(
+            pa.array(np.repeat(indices, lengths)), dictionary
+        )
+    else:
+        sample_column = pa.DictionaryArray.from_arrays(pa.array(indices), dictionary)
+        offsets = pa.array(np.concatenate([[0], np.cumsum(lengths)]), pa.int64())
+
+    arrays = [sample_column]
+    for name in ("x", *columns):
+        values = [
+            signal.x if name == "x" else signal.all.get(name, None)
+            for signal in signals
+        ]
+        missing = np.array([v is None for v in values])
+        flat = np.concatenate(
+            [
+                np.full(length, np.nan) if v is None else np.asarray(v, dtype=float)
+                for v, length in zip(values, lengths)
+            ]
+        )
+        if layout == "long":
+            mask = np.repeat(missing, lengths) if missing.any() else None
+            arrays.append(pa.array(flat, pa.float64(), mask=mask))
+        else:
+            arrays.append(
+                pa.LargeListArray.from_arrays(
+                    offsets,
+                    pa.array(flat, pa.float64()),
+                    mask=pa.array(missing) if missing.any() else None,
+                )
+            )
+
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class Spectra_writer:
+    """
+    Write tables of processed spectra to one Parquet file, or to an Arrow IPC file
+    if the suffix is .arrow, .feather or .ipc, one table at a time.
+    """
+
+    def __init__(
+        self,
+        filepath: Union[str, pathlib.Path],
+        columns: Sequence[str] = spectrum_columns,
+        layout: str = "long",
+        compression: Optional[str] = "zstd",
+        names: Optional[Sequence[str]] = None,
+    ):
+        self.filepath = pathlib.Path(filepath)
+        # All tables share one dictionary of sample names, IPC files can not
+        # replace dictionaries
+        self.names = None if names is None else list(names)
+        self.columns = tuple(columns)
+        self.layout = layout
+        self.schema = get_schema(self.columns, layout)
+
+        if self.filepath.suffix in ipc_suffixes:
+            self._writer = ipc.new_file(
+                str(self.filepath),
+                self.schema,
+                options=ipc.IpcWriteOptions(compression=compression),
+            )
+        else:
+            self._writer = pq.ParquetWriter(
+                str(self.filepath), self.schema, compression=compression or "none"
+            )
+
+    def write(self, samples: List) -> None:
+        if len(samples) < 1:
+            return
+        self._writer.write_table(
+            spectra_table(samples, self.columns, self.layout, names=self.names)
+        )
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
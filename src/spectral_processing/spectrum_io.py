@@ -0,0 +1,75 @@
+import pathlib
+from typing import IO, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+binary_suffixes = (".npz",)
+delimiters = ("\t", ",", ";")
+
+
+def read_spectrum(
+    file: Union[str, pathlib.Path, IO[bytes]]
+) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Read x and y from a two column text file or from a .npz archive.
+
+    File objects are read as .npz archives.
+    """
+    if hasattr(file, "read") or pathlib.Path(file).suffix in binary_suffixes:
+        with np.load(file) as f:
+            return f["x"], f["y"]
+
+    return read_text_spectrum(file)
+
+
+def read_text_spectrum(
+    file: Union[str, pathlib.Path]
+) -> Tuple[npt.NDArray, npt.NDArray]:
+    """
+    Read x and y from the first two columns of a delimited text file.
+
+    The delimiter is detected once from the first line with data and the file is
+    parsed with :py:func:`numpy.loadtxt`. Lines before the data, like column headers,
+    are skipped.
+    """
+    skiprows, delimiter = _inspect_text_file(file)
+
+    x, y = np.loadtxt(
+        file, delimiter=delimiter, skiprows=skiprows, usecols=(0, 1), unpack=True
+    )
+
+    return x, y
+
+
+def detect_delimiter(line: str) -> Optional[str]:
+    """
+    Tab, comma or semicolon, or None for whitespace
+    """
+    for delimiter in delimiters:
+        if delimiter in line:
+            return delimiter
+    return None
+
+
+def _inspect_text_file(file: Union[str, pathlib.Path]) -> Tuple[int, Optional[str]]:
+    with open(file, "r") as f:
+        for skiprows, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            delimiter = detect_delimiter(line)
+            if _is_numeric(line.split(delimiter)[:2]):
+                return skiprows, delimiter
+
+    raise ValueError(f"no spectral data found in {file}")
+
+
+def _is_numeric(values) -> bool:
+    if len(values) < 2:
+        return False
+    try:
+        [float(v) for v in values]
+    except ValueError:
+        return False
+    return True
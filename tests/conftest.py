@@ -0,0 +1,36 @@
+import pathlib
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).parents[1]))
+
+from benchmarks.synthetic import make_glass, make_olivine  # noqa: E402
+from benchmarks.synthetic import new_database as new_spectra_database  # noqa: E402
+from src.spectral_processing import Database_controller  # noqa: E402
+from src.spectral_processing.result_cache import result_cache  # noqa: E402
+
+
+def new_database(amount: int, length: int = 1000) -> Database_controller:
+    """
+    Database with amount synthetic glass samples, named S0, S1 etc.
+    """
+    return new_spectra_database(
+        [make_glass(length, seed=i) for i in range(amount)],
+        names=[f"S{i}" for i in range(amount)],
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+
+@pytest.fixture
+def olivine_file(tmp_path) -> pathlib.Path:
+    filepath = tmp_path / "olivine.txt"
+    np.savetxt(filepath, np.column_stack(make_olivine(800, seed=1)))
+    return filepath
@@ -0,0 +1,70 @@
+import numpy as np
+
+from benchmarks.synthetic import make_glass
+from conftest import new_database
+from src.event_management.calculate_handler import Calculation_listener
+from src.event_management.database_handler import Database_listener
+from src.spectral_processing import Calibration_processor
+from src.spectral_processing import database_controller as controller
+from src.spectral_processing.bir_optimizer import optimize_regions
+from src.spectral_processing.Processors import Interpolation_regions
+from src.spectral_processing.sample_processing import Lazy_sample
+
+regions = np.array(
+    [[200, 300], [635, 645], [800, 810], [1220, 2200], [3850, 4000]], dtype=float
+)
+
+
+def test_optimized_regions_are_valid():
+    x, y = make_glass(2000, seed=0)
+    optimized = optimize_regions(x, y, regions)
+
+    assert Interpolation_regions.is_valid(optimized)
+    np.testing.assert_array_equal(np.diff(optimized), np.diff(regions))
+    assert np.all(np.abs(optimized - regions) <= 50)
+
+
+def test_optimize_birs_loads_projects_once(tmp_path, monkeypatch):
+    database = new_database(6)
+    listener = Database_listener(database, Calibration_processor())
+    database.save_results()
+    listener.save_project(filepath=str(tmp_path / "project.h2o"))
+    listener.load_project(filepath=str(tmp_path / "project.h2o"))
+    assert sum(isinstance(sample, Lazy_sample) for sample in database.spectra) > 1
+
+    opened = []
+    project_file = controller.Project_file
+
+    def counted_project_file(filepath, *args, **kwargs):
+        opened.append(filepath)
+        return project_file(filepath, *args, **kwargs)
+
+    monkeypatch.setattr(controller, "Project_file", counted_project_file)
+    database.optimize_birs()
+
+    assert len(opened) == 1
+    assert not any(isinstance(sample, Lazy_sample) for sample in database.spectra)
+    for sample in database.spectra:
+        assert not sample.results_outdated
+        assert database.results.loc[sample.name, "rWS"] == sample.results["rWS"]
+
+
+def test_optimize_birs_task_can_be_cancelled(monkeypatch):
+    database = new_database(4)
+    listener = Calculation_listener(database)
+    monkeypatch.setattr(listener, "display_sample", lambda *args: None)
+    sample = database.get_sample(1)
+    before = sample.baseline.interpolation_regions.nested_array.copy()
+
+    # A main loop that never comes back, so that the task is not waited for
+    with listener.on_schedule.connected_to(lambda *args, **kwargs: None):
+        listener.optimize_birs(index=[1, 2, 3])
+        listener.cancel_task()
+    listener.task.wait()
+    listener.task.poll()
+
+    assert listener.task.finished
+    assert database.get_sample(1) is sample
+    np.testing.assert_array_equal(
+        sample.baseline.interpolation_regions.nested_array, before
+    )
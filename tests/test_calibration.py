@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from src.spectral_processing import Calibration_processor
+
+
+def get_calibration(amount: int = 20) -> Calibration_processor:
+    rng = np.random.default_rng(0)
+    index = [f"s{i}" for i in range(amount)]
+    H2OSi = pd.Series(rng.uniform(0.1, 2, amount), index=index)
+    H2Oreference = pd.Series(
+        3 * H2OSi.to_numpy() + 0.2 + rng.normal(0, 0.1, amount), index=index
+    )
+    H2Oreference.iloc[3] = np.nan
+    use = pd.Series(True, index=index)
+    use.iloc[5] = False
+
+    calibration = Calibration_processor()
+    calibration.import_calibration("test", H2OSi, H2Oreference, use)
+    return calibration
+
+
+def test_calibration_matches_polyfit():
+    calibration = get_calibration()
+    mask = calibration.use.to_numpy() & np.isfinite(calibration._H2Oreference)
+
+    (slope, intercept), covariance = np.polyfit(
+        calibration._H2OSi[mask], calibration._H2Oreference[mask], 1, cov=True
+    )
+    np.testing.assert_allclose(calibration.coefficients, (intercept, slope))
+    np.testing.assert_allclose(calibration.covariance, covariance[::-1, ::-1])
+
+
+def test_calibration_refits_only_when_standards_change():
+    calibration = get_calibration()
+    coefficients = calibration.coefficients
+    fit = calibration.calibration
+
+    # Not a standard
+    calibration.set_H2Oreference(5, 10.0)
+    assert calibration.calibration is fit
+
+    calibration.set_use(5, True)
+    assert calibration.calibration is not fit
+    assert calibration.coefficients != coefficients
@@ -0,0 +1,52 @@
+import warnings
+
+import numpy as np
+
+from conftest import new_database
+
+
+def test_sample_saved():
+    database = new_database(2)
+    database.current_sample_index = 1
+    sample = database.current_sample
+    sample.calculate_results()
+    assert not database.sample_saved
+
+    database.save_sample()
+    assert database.sample_saved
+
+    sample.set_baseline({"smoothing": 5})
+    sample.calculate_results()
+    assert not database.sample_saved
+
+
+def test_save_without_regions():
+    database = new_database(3)
+    sample = database.get_sample(1)
+    while sample.interpolation.regions.amount > 0:
+        sample.remove_interpolation_region(0)
+
+    database.save_sample(1)
+    database.save_all_samples()
+
+    saved = database.interpolation_regions
+    assert saved.loc["S1"].isna().all()
+    assert saved.loc[["S0", "S2"]].notna().all(axis=None)
+
+
+def test_save_samples_upcasts_columns():
+    database = new_database(2)
+    database.save_all_samples()
+    database.baseline_regions = database.baseline_regions.astype("int16")
+    sample = database.get_sample(0)
+    sample.baseline.interpolation_regions.set_array(
+        sample.baseline.interpolation_regions.nested_array + 0.5
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        database.save_all_samples()
+
+    saved = database.baseline_regions.loc["S0"].to_numpy()
+    expected = sample.baseline.interpolation_regions.nested_array.reshape(-1)
+    np.testing.assert_array_equal(saved[: expected.size], expected)
@@ -0,0 +1,100 @@
+import pickle
+
+import numpy as np
+import ramCOH as ram
+
+from conftest import new_database
+
+
+def test_batch_interferences_are_saved_per_sample(olivine_file):
+    database = new_database(4)
+    database.add_interference(olivine_file, name="S0")
+    database.apply_interference(olivine_file, names=["S2", "S3"])
+
+    S2, S3 = (database.get_sample_by_name(name) for name in ("S2", "S3"))
+    assert S2.interference_sample is not S3.interference_sample
+
+    smoothing = S2.interference_sample.baseline.settings.smoothing
+    S3.interference_sample.set_baseline({"smoothing": 0.123})
+    database.save_all_samples()
+
+    saved = database.interference_settings["settings"][("baseline", "smoothing")]
+    assert saved["S3"] == 0.123
+    assert saved["S2"] == smoothing
+    assert saved.index.is_unique
+
+    database.current_sample_index = 3
+    database.reset_sample(tab="interference")
+    assert S3.interference_sample.baseline.settings.smoothing == 0.123
+    assert S2.interference_sample.baseline.settings.smoothing == smoothing
+
+
+def test_subtract_interferences_matches_single_samples(olivine_file):
+    batch = new_database(3)
+    single = new_database(3)
+    for database in (batch, single):
+        for sample in database.spectra:
+            sample.interference.settings.spectrum = "deconvoluted"
+
+    batch.apply_interference(olivine_file)
+    batch.subtract_interferences()
+
+    for name in single.names:
+        single.add_interference(olivine_file, name=name)
+        sample = single.get_sample_by_name(name)
+        sample.interference_sample.calculate_baseline()
+        sample.interference_sample.deconvolve()
+        sample.subtract_interference()
+
+    for name in batch.names:
+        expected = single.get_sample_by_name(name).sample.signal.interference_corrected
+        result = batch.get_sample_by_name(name).sample.signal.interference_corrected
+        np.testing.assert_allclose(result, expected)
+
+
+def test_subtract_interferences_fits_baselines_once(olivine_file, monkeypatch):
+    database = new_database(4)
+    database.apply_interference(olivine_file)
+    S3 = database.get_sample_by_name("S3")
+    S3.interference_sample.set_baseline({"smoothing": 0.123})
+
+    fits = []
+    baseline_correct = ram.RamanProcessing.baselineCorrect
+
+    def count_fits(self, *args, **kwargs):
+        fits.append(self)
+        return baseline_correct(self, *args, **kwargs)
+
+    monkeypatch.setattr(ram.RamanProcessing, "baselineCorrect", count_fits)
+    database.subtract_interferences()
+
+    assert len(fits) == 2
+    S0 = database.get_sample_by_name("S0").interference_sample.sample
+    for name in ("S1", "S2"):
+        interference = database.get_sample_by_name(name).interference_sample.sample
+        np.testing.assert_array_equal(
+            interference.signal.baseline_corrected, S0.signal.baseline_corrected
+        )
+    assert not np.array_equal(
+        S3.interference_sample.sample.signal.baseline_corrected,
+        S0.signal.baseline_corrected,
+    )
+
+
+def test_resampled_interferences_are_shared(olivine_file):
+    database = new_database(3)
+    database.apply_interference(olivine_file)
+    database.subtract_interferences()
+
+    S0, S1, S2 = database.spectra
+    resampled = [
+        s.interference.get_interference_spectrum(s.interference_sample.sample)
+        for s in (S0, S1, S2)
+    ]
+    assert resampled[0] is resampled[1] is resampled[2]
+
+    S2 = pickle.loads(pickle.dumps(S2))
+    S2.interference_sample.set_baseline({"smoothing": 0.123})
+    S2.interference_sample.calculate_baseline()
+    changed = S2.interference.get_interference_spectrum(S2.interference_sample.sample)
+    assert not np.array_equal(changed, resampled[0])
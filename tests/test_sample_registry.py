@@ -0,0 +1,23 @@
+from src.spectral_processing.sample_registry import Sample_registry
+
+
+def get_registry(amount: int) -> Sample_registry:
+    registry = Sample_registry()
+    names = [f"s{i}" for i in range(amount)]
+    registry.extend(range(amount), names=names, files=names)
+    return registry
+
+
+def test_remove():
+    registry = get_registry(10)
+
+    assert registry.remove([7, 2, 9, 2]) == ["s2", "s7", "s9"]
+
+    expected = [0, 1, 3, 4, 5, 6, 8]
+    assert list(registry.spectra) == expected
+    assert list(registry.names) == [f"s{i}" for i in expected]
+    assert list(registry.files) == [f"s{i}" for i in expected]
+    for i, name in enumerate(registry.names):
+        assert registry.index(name) == i
+    assert "s7" not in registry
+    assert registry.remove([]) == []
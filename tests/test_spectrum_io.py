@@ -0,0 +1,18 @@
+import numpy as np
+
+from benchmarks.synthetic import make_glass
+from src.spectral_processing.spectrum_io import read_spectrum
+
+
+def test_read_spectrum(tmp_path):
+    x, y = make_glass(100, seed=0)
+
+    np.savez(tmp_path / "glass.npz", x=x, y=y)
+    with open(tmp_path / "glass.txt", "w") as f:
+        f.write("wavenumber,intensity\n")
+        np.savetxt(f, np.column_stack([x, y]), delimiter=",")
+
+    for file in ("glass.npz", "glass.txt"):
+        x_read, y_read = read_spectrum(tmp_path / file)
+        np.testing.assert_allclose(x_read, x)
+        np.testing.assert_allclose(y_read, y)